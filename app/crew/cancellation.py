@@ -0,0 +1,77 @@
+"""
+Cooperative cancellation for crew runs.
+
+A CancelToken is shared between the request that started a run and the
+crew executing it. The crew checks it at every agent step, task and tool
+boundary, so a cancelled or expired run stops before its next LLM or
+tool call.
+"""
+import threading
+import time
+from typing import Optional
+
+
+class RunCancelled(BaseException):
+    """
+    Raised inside a crew run once its token is cancelled or past its deadline.
+
+    Derives from BaseException (like asyncio.CancelledError) so CrewAI's
+    retry and error handling, which catch Exception, do not swallow it.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancelToken:
+    """Cancellation flag with an optional deadline."""
+
+    DEADLINE_EXCEEDED = "deadline exceeded"
+
+    def __init__(self, timeout: Optional[float] = None):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+        self.deadline = time.monotonic() + timeout if timeout else None
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.remaining == 0:
+            self.cancel(self.DEADLINE_EXCEEDED)
+        return self._event.is_set()
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """
+        Seconds left until the deadline, or None when there is no deadline.
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        if self.cancelled:
+            raise RunCancelled(self.reason)
+
+    def callback(self, *_):
+        """
+        Crew step_callback/task_callback hook.
+        """
+        self.check()
+
+
+def crew_callbacks(cancel_token: Optional[CancelToken]) -> dict:
+    """
+    Crew keyword arguments that stop the run at the next step or task boundary.
+    """
+    if cancel_token is None:
+        return {}
+    return {
+        "step_callback": cancel_token.callback,
+        "task_callback": cancel_token.callback,
+    }
@@ -5,22 +5,42 @@ dotenv.load_dotenv()
 from typing import Optional
 from crewai import Crew, Agent, Task
 from crewai.project import CrewBase, task, agent, crew
-from crewai.knowledge.source.string_knowledge_source import StringKnowledgeSource
 from app.crew.schemas import JobList, RankedJobList, ChosenJob
-from app.crew.tools import create_web_search_tool
+from app.crew.tools import create_web_search_tool, build_search_query
+from app.crew.cancellation import CancelToken, crew_callbacks
+from app.crew.llm_router import llm_router
+from app.crew.knowledge import ResumeKnowledge, with_resume
+from app.crew.repair import RepairingConverter
 
 
 @CrewBase
 class JobSearchCrew:
 
-    def __init__(self, resume_text: str, job_sites: Optional[list[str]] = None):
-        self.resume_knowledge = StringKnowledgeSource(content=resume_text)
-        self.web_search_tool = create_web_search_tool(domains=job_sites)
+    def __init__(
+        self,
+        resume_text: str,
+        job_sites: Optional[list[str]] = None,
+        cancel_token: Optional[CancelToken] = None,
+    ):
+        self.resume_knowledge = ResumeKnowledge(resume_text)
+        self.cancel_token = cancel_token
+        self.web_search_tool = create_web_search_tool(domains=job_sites, cancel_token=cancel_token)
+
+    def kickoff_inputs(self, inputs: dict, task_name: str) -> dict:
+        """
+        Kickoff inputs for one task, with the search query and the resume
+        context (or its chunks relevant to that task) the task descriptions
+        and agent backstories reference.
+        """
+        query = "\n".join([self.tasks_config[task_name]["description"], *map(str, inputs.values())])
+        search_query = build_search_query(inputs["level"], inputs["position"], inputs["location"])
+        return {**inputs, "search_query": search_query, **self.resume_knowledge.inputs(query)}
 
     @agent
     def job_search_agent(self):
         return Agent(
             config=self.agents_config["job_search_agent"],
+            llm=llm_router.llm_for("job_search_agent"),
             tools=[self.web_search_tool]
         )
 
@@ -28,56 +48,72 @@ class JobSearchCrew:
     def job_matching_agent(self):
         return Agent(
             config=self.agents_config["job_matching_agent"],
-            knowledge_sources=[self.resume_knowledge]
+            backstory=with_resume(self.agents_config["job_matching_agent"]["backstory"]),
+            llm=llm_router.llm_for("job_matching_agent")
         )
 
     @agent
     def resume_optimization_agent(self):
         return Agent(
             config=self.agents_config["resume_optimization_agent"],
-            knowledge_sources=[self.resume_knowledge]
+            backstory=with_resume(self.agents_config["resume_optimization_agent"]["backstory"]),
+            llm=llm_router.llm_for("resume_optimization_agent")
         )
 
     @agent
     def company_research_agent(self):
         return Agent(
             config=self.agents_config["company_research_agent"],
-            tools=[self.web_search_tool],
-            knowledge_sources=[self.resume_knowledge]
+            backstory=with_resume(self.agents_config["company_research_agent"]["backstory"]),
+            llm=llm_router.llm_for("company_research_agent"),
+            tools=[self.web_search_tool]
         )
 
     @agent
     def interview_prep_agent(self):
         return Agent(
             config=self.agents_config["interview_prep_agent"],
-            knowledge_sources=[self.resume_knowledge]
+            backstory=with_resume(self.agents_config["interview_prep_agent"]["backstory"]),
+            llm=llm_router.llm_for("interview_prep_agent")
         )
 
     @task
     def job_extraction_task(self):
         return Task(
             config=self.tasks_config["job_extraction_task"],
-            output_pydantic=JobList
+            output_pydantic=JobList,
+            converter_cls=RepairingConverter
         )
 
     @task
     def job_matching_task(self):
         return Task(
             config=self.tasks_config["job_matching_task"],
-            output_pydantic=RankedJobList
+            output_pydantic=RankedJobList,
+            converter_cls=RepairingConverter,
+            context=[
+                self.job_extraction_task()
+            ]
         )
 
     @task
     def job_selection_task(self):
         return Task(
             config=self.tasks_config["job_selection_task"],
-            output_pydantic=ChosenJob
+            output_pydantic=ChosenJob,
+            converter_cls=RepairingConverter,
+            context=[
+                self.job_matching_task()
+            ]
         )
 
     @task
     def resume_rewriting_task(self):
         return Task(
-            config=self.tasks_config["resume_rewriting_task"]
+            config=self.tasks_config["resume_rewriting_task"],
+            context=[
+                self.job_selection_task()
+            ]
         )
 
     @task
@@ -105,5 +141,6 @@ class JobSearchCrew:
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
-            verbose=True
+            verbose=True,
+            **crew_callbacks(self.cancel_token)
         )
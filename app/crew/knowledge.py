@@ -0,0 +1,190 @@
+"""
+Resume context for agents, inlined or retrieved.
+
+Short resumes (the common case) are inlined into the agent backstory, which
+skips CrewAI knowledge sources and their embedding call and vector store
+writes on every request. Resumes above KNOWLEDGE_INLINE_MAX_TOKENS are
+chunked and only the chunks most relevant to the task are inlined. Chunk
+and query embeddings are cached on disk by content hash, and cache entries
+unused for KNOWLEDGE_CACHE_TTL_SECONDS are garbage collected.
+"""
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import litellm
+
+KNOWLEDGE_INLINE_MAX_TOKENS = int(os.getenv("KNOWLEDGE_INLINE_MAX_TOKENS", "2000"))
+KNOWLEDGE_EMBEDDING_MODEL = os.getenv("KNOWLEDGE_EMBEDDING_MODEL", "text-embedding-3-small")
+
+EMBEDDING_CACHE_DIR = Path("output") / "knowledge" / "embeddings"
+KNOWLEDGE_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+# Garbage collect the embedding cache at most this often per process
+GC_INTERVAL_SECONDS = 60 * 60
+
+CHUNK_MAX_CHARS = 1200
+TOP_K_CHUNKS = 4
+# Embedding inputs are capped well below the model's context limit
+QUERY_MAX_CHARS = 4000
+
+# Input name interpolated into agent backstories by CrewAI
+RESUME_INPUT = "user_resume"
+
+_lock = threading.Lock()
+_last_gc = 0.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count: ~4 ASCII characters per token, ~1 token per other character (e.g. Hangul).
+    """
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def with_resume(backstory: str) -> str:
+    """
+    Append the resume placeholder to an agent backstory.
+
+    The resume itself is passed as the `user_resume` input, so braces in it
+    are never parsed as template variables.
+    """
+    return f"{backstory.rstrip()}\n\n지원자 이력서:\n{{{RESUME_INPUT}}}\n"
+
+
+def chunk_text(text: str, max_chars: int = CHUNK_MAX_CHARS) -> list[str]:
+    """
+    Pack paragraphs into chunks of at most max_chars, splitting long paragraphs.
+    """
+    chunks: list[str] = []
+    current = ""
+
+    for paragraph in (part.strip() for part in text.split("\n\n")):
+        if not paragraph:
+            continue
+        pieces = [paragraph[i:i + max_chars] for i in range(0, len(paragraph), max_chars)]
+        for piece in pieces:
+            if current and len(current) + len(piece) + 2 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ResumeKnowledge:
+    """The user's resume, inlined whole when small or by relevant chunks when large."""
+
+    def __init__(self, resume_text: str):
+        self.resume_text = resume_text
+        self.inline = estimate_tokens(resume_text) <= KNOWLEDGE_INLINE_MAX_TOKENS
+        self._chunks: Optional[list[str]] = None
+        self._chunk_embeddings: Optional[list[list[float]]] = None
+        self._chunks_lock = threading.Lock()
+
+    def context(self, query: str) -> str:
+        """
+        Resume text to inline for a task described by query.
+        """
+        if self.inline:
+            return self.resume_text
+
+        chunks, chunk_embeddings = self._embedded_chunks()
+        query_embedding = embed([query[:QUERY_MAX_CHARS]])[0]
+        scores = [_cosine(query_embedding, embedding) for embedding in chunk_embeddings]
+        top = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)[:TOP_K_CHUNKS]
+
+        # Keep document order so the excerpt reads naturally
+        return "\n\n...\n\n".join(chunks[i] for i in sorted(top))
+
+    def inputs(self, query: str) -> dict[str, str]:
+        return {RESUME_INPUT: self.context(query)}
+
+    def _embedded_chunks(self) -> tuple[list[str], list[list[float]]]:
+        with self._chunks_lock:
+            if self._chunks is None:
+                self._chunks = chunk_text(self.resume_text)
+                self._chunk_embeddings = embed(self._chunks)
+            return self._chunks, self._chunk_embeddings
+
+
+def embed(texts: list[str]) -> list[list[float]]:
+    """
+    Embed texts, reusing cached embeddings of identical content.
+    """
+    keys = [_cache_key(text) for text in texts]
+    embeddings: dict[str, list[float]] = {}
+
+    for key in set(keys):
+        cached = _read_cached(key)
+        if cached is not None:
+            embeddings[key] = cached
+
+    missing = [(key, text) for key, text in zip(keys, texts) if key not in embeddings]
+    if missing:
+        unique = dict(missing)
+        response = litellm.embedding(model=KNOWLEDGE_EMBEDDING_MODEL, input=list(unique.values()))
+        for key, item in zip(unique, response.data):
+            embeddings[key] = item["embedding"]
+            _write_cached(key, item["embedding"])
+
+    collect_garbage()
+    return [embeddings[key] for key in keys]
+
+
+def collect_garbage(force: bool = False):
+    """
+    Delete cached embeddings unused for longer than the TTL.
+    """
+    global _last_gc
+    now = time.time()
+    with _lock:
+        if not force and now - _last_gc < GC_INTERVAL_SECONDS:
+            return
+        _last_gc = now
+
+    if not EMBEDDING_CACHE_DIR.exists():
+        return
+    cutoff = now - KNOWLEDGE_CACHE_TTL_SECONDS
+    for path in EMBEDDING_CACHE_DIR.glob("*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _cache_key(text: str) -> str:
+    return hashlib.sha256(f"{KNOWLEDGE_EMBEDDING_MODEL}\x00{text}".encode("utf-8")).hexdigest()[:32]
+
+
+def _read_cached(key: str) -> Optional[list[float]]:
+    path = EMBEDDING_CACHE_DIR / f"{key}.json"
+    try:
+        embedding = json.loads(path.read_text(encoding="utf-8"))
+        # Mark as recently used so garbage collection keeps it
+        os.utime(path)
+        return embedding
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_cached(key: str, embedding: list[float]):
+    EMBEDDING_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = EMBEDDING_CACHE_DIR / f"{key}.json"
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(json.dumps(embedding), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def _cosine(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
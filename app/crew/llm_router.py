@@ -0,0 +1,212 @@
+"""
+Latency-tiered LLM routing for agents and tasks.
+
+Tiers (fast / balanced / deep) and the agent/task routes are defined in
+config/llm_tiers.yaml. Each run records per-tier latency, success rate,
+token usage and cost; with `adaptive: true` the candidate tiers of a route
+are reordered by the latency and success rate measured on that route. A
+fraction of adaptive calls (`explore_rate`) goes to another candidate tier
+first, so fallback tiers get samples on the route even when nothing fails.
+"""
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+import yaml
+from pathlib import Path
+from crewai import LLM
+
+T = TypeVar("T")
+
+CONFIG_DIR = Path(__file__).parent / "config"
+
+# Weight of the latest sample in the latency moving average
+EWMA_ALPHA = 0.3
+# Samples required per tier before adaptive routing reorders it
+ADAPTIVE_MIN_SAMPLES = 5
+# Share of adaptive calls routed to another candidate first to collect samples
+DEFAULT_EXPLORE_RATE = 0.1
+
+
+class TierStats:
+    """Running latency, reliability and cost counters for one tier."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.total_latency = 0.0
+        self.ewma_latency: Optional[float] = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        if not self.calls:
+            return 1.0
+        return (self.calls - self.failures) / self.calls
+
+    def record(self, latency: float, success: bool):
+        self.calls += 1
+        if not success:
+            self.failures += 1
+        self.total_latency += latency
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma_latency
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "success_rate": round(self.success_rate, 3),
+            "avg_latency": round(self.total_latency / self.calls, 3) if self.calls else None,
+            "ewma_latency": round(self.ewma_latency, 3) if self.ewma_latency is not None else None,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost": round(self.cost, 6),
+        }
+
+
+class LLMRouter:
+    """Pick an LLM tier per agent/task and fall back to other tiers on failure."""
+
+    def __init__(self, config: dict):
+        self.tiers: dict[str, dict] = config["tiers"]
+        self.agent_routes: dict[str, str] = config.get("agents") or {}
+        self.task_routes: dict[str, str] = config.get("tasks") or {}
+        self.default_tier: str = config.get("default_tier", next(iter(self.tiers)))
+        self.adaptive: bool = bool(config.get("adaptive", False))
+        self.explore_rate: float = float(config.get("explore_rate", DEFAULT_EXPLORE_RATE))
+        self._stats = {tier: TierStats() for tier in self.tiers}
+        # Latency differs far more between tasks than between tiers, so adaptive
+        # ordering only compares tiers measured on the same (agent, task) route
+        self._route_stats: dict[tuple[str, Optional[str], str], TierStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, filename: str = "llm_tiers.yaml") -> "LLMRouter":
+        with open(CONFIG_DIR / filename, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+        if "LLM_ROUTING_ADAPTIVE" in os.environ:
+            config["adaptive"] = os.environ["LLM_ROUTING_ADAPTIVE"].lower() in ("1", "true", "yes")
+        return cls(config)
+
+    def tier_for(self, agent_name: str, task_name: Optional[str] = None) -> str:
+        """
+        Configured tier for a task, falling back to the agent's tier.
+        """
+        if task_name and task_name in self.task_routes:
+            return self.task_routes[task_name]
+        return self.agent_routes.get(agent_name, self.default_tier)
+
+    def candidates(self, agent_name: str, task_name: Optional[str] = None) -> list[str]:
+        """
+        Tiers to try in order: the routed tier followed by its fallback chain.
+        """
+        chain = []
+        tier = self.tier_for(agent_name, task_name)
+        while tier and tier not in chain:
+            chain.append(tier)
+            tier = self.tiers[tier].get("fallback")
+
+        if self.adaptive and len(chain) > 1:
+            with self._lock:
+                route_stats = {t: self._route_stats.get((agent_name, task_name, t)) for t in chain}
+            unmeasured = [t for t, stats in route_stats.items() if stats is None or stats.calls < ADAPTIVE_MIN_SAMPLES]
+            if not unmeasured:
+                chain.sort(key=lambda t: self._score(route_stats[t]))
+
+            # Explore: try another tier first; the rest of the chain still serves as fallback
+            if random.random() < self.explore_rate:
+                explore = [t for t in unmeasured if t != chain[0]] or chain[1:]
+                tier = random.choice(explore)
+                chain.remove(tier)
+                chain.insert(0, tier)
+        return chain
+
+    def llm(self, tier: str) -> LLM:
+        config = self.tiers[tier]
+        return LLM(model=config["model"], timeout=config.get("timeout"))
+
+    def llm_for(self, agent_name: str, task_name: Optional[str] = None) -> LLM:
+        """
+        Configured LLM for an agent, without adaptive reordering or exploration.
+        """
+        return self.llm(self.tier_for(agent_name, task_name))
+
+    def run(self, agent_name: str, task_name: str, execute: Callable[[LLM], T]) -> T:
+        """
+        Call `execute` with the LLM of each candidate tier until one succeeds.
+
+        `execute` is expected to return a CrewOutput; its token usage is
+        recorded as the tier's cost. Cancellation (RunCancelled) is not an
+        Exception and is never retried on another tier.
+        """
+        last_error: Optional[Exception] = None
+
+        for tier in self.candidates(agent_name, task_name):
+            start = time.monotonic()
+            try:
+                result = execute(self.llm(tier))
+            except Exception as e:
+                self._record(agent_name, task_name, tier, time.monotonic() - start, success=False)
+                last_error = e
+                continue
+
+            self._record(
+                agent_name,
+                task_name,
+                tier,
+                time.monotonic() - start,
+                success=True,
+                usage=getattr(result, "token_usage", None),
+            )
+            return result
+
+        raise last_error
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "adaptive": self.adaptive,
+                "explore_rate": self.explore_rate,
+                "tiers": {
+                    tier: {"model": self.tiers[tier]["model"], **stats.to_dict()}
+                    for tier, stats in self._stats.items()
+                },
+            }
+
+    @staticmethod
+    def _score(stats: TierStats) -> float:
+        return (stats.ewma_latency or 0.0) / max(stats.success_rate, 0.1)
+
+    def _record(
+        self,
+        agent_name: str,
+        task_name: Optional[str],
+        tier: str,
+        latency: float,
+        success: bool,
+        usage: Any = None,
+    ):
+        config = self.tiers[tier]
+        with self._lock:
+            self._route_stats.setdefault((agent_name, task_name, tier), TierStats()).record(latency, success)
+            stats = self._stats[tier]
+            stats.record(latency, success)
+            if usage is not None:
+                prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+                completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+                stats.prompt_tokens += prompt_tokens
+                stats.completion_tokens += completion_tokens
+                stats.cost += (
+                    prompt_tokens / 1000 * config.get("cost_per_1k_input", 0)
+                    + completion_tokens / 1000 * config.get("cost_per_1k_output", 0)
+                )
+
+
+llm_router = LLMRouter.from_config()
@@ -0,0 +1,241 @@
+"""
+Dependency-aware, resumable execution of the full JobSearchCrew pipeline.
+
+Tasks are scheduled from their `context=` graph instead of strictly in
+sequence, so independent tasks (resume rewriting and company research) run
+concurrently. Every completed task output is checkpointed to disk; a failed
+or cancelled run can be resumed and only re-runs the tasks that did not
+complete. Checkpoints hold the user's resume, so they are deleted once the
+run completes, and abandoned ones are swept after CHECKPOINT_TTL_SECONDS.
+"""
+import json
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Optional
+
+from crewai import Crew, Task
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
+
+from app.crew.cancellation import CancelToken, RunCancelled, crew_callbacks
+from app.crew.crew import JobSearchCrew
+from app.crew.llm_router import llm_router
+from app.crew.steps import load_config
+
+CHECKPOINT_DIR = Path("output") / "checkpoints"
+PIPELINE_WORKERS = 3
+
+# Checkpoints of failed or cancelled runs not resumed for this long are deleted
+CHECKPOINT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def sweep_checkpoints():
+    """
+    Delete checkpoint directories of runs untouched for longer than the TTL.
+    """
+    if not CHECKPOINT_DIR.exists():
+        return
+    cutoff = time.time() - CHECKPOINT_TTL_SECONDS
+    for run_dir in CHECKPOINT_DIR.iterdir():
+        try:
+            last_modified = max(path.stat().st_mtime for path in [run_dir, *run_dir.iterdir()])
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        if last_modified < cutoff:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+
+class PipelineResult:
+    """Task outputs in pipeline order, shaped like a CrewOutput for parse_crew_result."""
+
+    def __init__(self, tasks_output: list[TaskOutput]):
+        self.tasks_output = tasks_output
+
+
+class CrewPipeline:
+    """Run JobSearchCrew tasks by dependency with per-task checkpoints."""
+
+    def __init__(
+        self,
+        run_id: str,
+        resume_text: str,
+        job_sites: Optional[list[str]] = None,
+        cancel_token: Optional[CancelToken] = None,
+        checkpoint: bool = True,
+    ):
+        """
+        Args:
+            run_id: Checkpoint directory name; the /crew/kickoff task id
+            checkpoint: Save task outputs for resuming; off for runs that can never be resumed
+        """
+        self.run_id = run_id
+        self.checkpoint = checkpoint
+        self.resume_text = resume_text
+        self.job_sites = job_sites
+        self.cancel_token = cancel_token
+        self.checkpoint_dir = CHECKPOINT_DIR / run_id
+
+        self.crew_base = JobSearchCrew(resume_text=resume_text, job_sites=job_sites, cancel_token=cancel_token)
+        self.tasks: list[Task] = self.crew_base.crew().tasks
+        self.task_agents = {name: config["agent"] for name, config in load_config("tasks.yaml").items()}
+        self.dependencies = self._dependency_graph(self.tasks)
+
+    @classmethod
+    def load(cls, run_id: str, cancel_token: Optional[CancelToken] = None) -> "CrewPipeline":
+        """
+        Recreate a previous run from its checkpoint directory.
+        """
+        meta_path = CHECKPOINT_DIR / run_id / "run.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"No checkpoint for run {run_id}")
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        pipeline = cls(
+            run_id,
+            resume_text=meta["resume_text"],
+            job_sites=meta["job_sites"],
+            cancel_token=cancel_token,
+        )
+        pipeline.inputs = meta["inputs"]
+        return pipeline
+
+    @staticmethod
+    def exists(run_id: str) -> bool:
+        return (CHECKPOINT_DIR / run_id / "run.json").exists()
+
+    def completed_tasks(self) -> list[str]:
+        return [task.name for task in self.tasks if self._checkpoint_path(task).exists()]
+
+    def run(self, inputs: Optional[dict] = None) -> PipelineResult:
+        """
+        Run all tasks not yet checkpointed, independent tasks concurrently.
+
+        Inputs are saved with the first run; resumed runs reuse them.
+        """
+        if self.checkpoint:
+            sweep_checkpoints()
+        if inputs is not None:
+            self.inputs = inputs
+            if self.checkpoint:
+                self._save_meta()
+
+        done = self._restore_checkpoints() if self.checkpoint else set()
+        pending = [task for task in self.tasks if task.name not in done]
+        running: dict[Future, Task] = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=PIPELINE_WORKERS) as pool:
+            while pending or running:
+                if error is None:
+                    for task in [t for t in pending if all(dep in done for dep in self.dependencies[t.name])]:
+                        if self.cancel_token and self.cancel_token.cancelled:
+                            # Stop scheduling, but still collect and checkpoint running tasks
+                            error = RunCancelled(self.cancel_token.reason)
+                            break
+                        pending.remove(task)
+                        running[pool.submit(self._execute, task)] = task
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    try:
+                        future.result()
+                    except BaseException as e:
+                        # Let tasks already running finish and checkpoint, then re-raise
+                        error = error or e
+                        # Cancellation raised from task_callback comes after the output is set
+                        if task.output is None:
+                            continue
+                    if self.checkpoint:
+                        self._save_checkpoint(task)
+                    done.add(task.name)
+
+        if error is not None:
+            raise error
+        if pending:
+            raise RuntimeError(f"Unresolvable task dependencies: {[task.name for task in pending]}")
+
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+        return PipelineResult([task.output for task in self.tasks])
+
+    def _execute(self, task: Task):
+        agent_name = self.task_agents[task.name]
+        inputs = self.crew_base.kickoff_inputs(self.inputs, task.name)
+
+        def execute(llm):
+            task.agent.llm = llm
+            crew = Crew(
+                agents=[task.agent],
+                tasks=[task],
+                verbose=True,
+                **crew_callbacks(self.cancel_token)
+            )
+            return crew.kickoff(inputs=inputs)
+
+        llm_router.run(agent_name, task.name, execute)
+
+    @staticmethod
+    def _dependency_graph(tasks: list[Task]) -> dict[str, list[str]]:
+        """
+        Map each task to the tasks in its context.
+
+        Tasks without an explicit context list depend on the previous task,
+        matching sequential execution.
+        """
+        graph = {}
+        for index, task in enumerate(tasks):
+            if isinstance(task.context, list):
+                graph[task.name] = [context_task.name for context_task in task.context]
+            else:
+                graph[task.name] = [tasks[index - 1].name] if index else []
+        return graph
+
+    def _checkpoint_path(self, task: Task) -> Path:
+        return self.checkpoint_dir / f"{task.name}.json"
+
+    def _save_meta(self):
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "inputs": self.inputs,
+            "resume_text": self.resume_text,
+            "job_sites": self.job_sites,
+        }
+        (self.checkpoint_dir / "run.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+    def _save_checkpoint(self, task: Task):
+        output = task.output
+        data = {
+            "raw": output.raw,
+            "pydantic": output.pydantic.model_dump(mode="json") if output.pydantic else None,
+            "agent": output.agent,
+        }
+        path = self._checkpoint_path(task)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(path)
+
+    def _restore_checkpoints(self) -> set[str]:
+        """
+        Load checkpointed outputs onto their tasks so dependents see them as context.
+        """
+        restored = set()
+        for task in self.tasks:
+            path = self._checkpoint_path(task)
+            if not path.exists():
+                continue
+            data = json.loads(path.read_text(encoding="utf-8"))
+            pydantic = task.output_pydantic(**data["pydantic"]) if data["pydantic"] and task.output_pydantic else None
+            task.output = TaskOutput(
+                name=task.name,
+                description=task.description,
+                raw=data["raw"],
+                pydantic=pydantic,
+                agent=data["agent"],
+                output_format=OutputFormat.PYDANTIC if pydantic else OutputFormat.RAW,
+            )
+            restored.add(task.name)
+        return restored
@@ -0,0 +1,397 @@
+"""
+Local repair of malformed structured output.
+
+When a task's output fails pydantic validation, CrewAI asks the LLM to
+convert it again, which costs another full round trip. RepairingConverter
+first tries to fix the output locally: it extracts the JSON from code
+fences and surrounding prose, removes trailing commas, closes truncated
+output, coerces scores, booleans and dates, and drops list items that are
+still invalid while keeping the valid ones. The LLM is only asked again
+when local repair fails, including when every item of a list is invalid.
+"""
+import json
+import re
+import threading
+import types
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Optional, Union, get_args, get_origin
+
+from crewai.utilities.converter import Converter
+from pydantic import BaseModel, ValidationError
+
+# Date formats seen in job postings, tried in order
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y.%m.%d",
+    "%Y/%m/%d",
+    "%Y%m%d",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%m/%d/%Y",
+    "%d.%m.%Y",
+]
+TRUE_VALUES = {"true", "yes", "y", "1", "예", "네", "가능", "o"}
+FALSE_VALUES = {"false", "no", "n", "0", "아니오", "아니요", "불가", "불가능", "x"}
+
+# Scores are on a 1-5 scale (see job_matching_task)
+MATCH_SCORE_SCALE = 5
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.S)
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_KOREAN_DATE = re.compile(r"(\d{4})\s*년\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일")
+_DAYS_AGO = re.compile(r"(\d+)\s*(?:days?\s+ago|일\s*전)", re.I)
+_SCORE = re.compile(r"(-?\d+(?:\.\d+)?)\s*(?:/\s*(\d+(?:\.\d+)?))?")
+
+
+class RepairStats:
+    """Counts of local repair outcomes and the fixes applied."""
+
+    def __init__(self):
+        self.outcomes: dict[str, Counter] = {}
+        self.fixes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, model_name: str, outcome: str, fixes: Counter):
+        with self._lock:
+            self.outcomes.setdefault(model_name, Counter())[outcome] += 1
+            self.fixes.update(fixes)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            models = {
+                name: {
+                    "attempts": sum(counts.values()),
+                    "clean": counts["clean"],
+                    "repaired": counts["repaired"],
+                    "llm_fallbacks": counts["failed"],
+                }
+                for name, counts in self.outcomes.items()
+            }
+            return {
+                "attempts": sum(model["attempts"] for model in models.values()),
+                "clean": sum(model["clean"] for model in models.values()),
+                "repaired": sum(model["repaired"] for model in models.values()),
+                "llm_fallbacks": sum(model["llm_fallbacks"] for model in models.values()),
+                "models": models,
+                "fixes": dict(self.fixes),
+            }
+
+
+repair_stats = RepairStats()
+
+
+class RepairingConverter(Converter):
+    """Converter that repairs output locally before asking the LLM to convert it."""
+
+    def to_pydantic(self, current_attempt=1):
+        if current_attempt == 1:
+            repaired = repair(self.text, self.model)
+            if repaired is not None:
+                return repaired
+        return super().to_pydantic(current_attempt)
+
+
+def repair(text: str, model: type[BaseModel]) -> Optional[BaseModel]:
+    """
+    Parse and coerce text into model, or return None if it cannot be repaired.
+    """
+    fixes: Counter = Counter()
+    try:
+        data = extract_json(text, fixes)
+        data = _wrap_list(data, model, fixes)
+        result = model.model_validate(coerce_model(data, model, fixes))
+    except (ValueError, TypeError, ValidationError):
+        repair_stats.record(model.__name__, "failed", fixes)
+        return None
+
+    # With converter_cls set, CrewAI sends valid output through here as well
+    repair_stats.record(model.__name__, "repaired" if fixes else "clean", fixes)
+    return result
+
+
+def extract_json(text: str, fixes: Counter) -> Any:
+    """
+    Extract the first JSON value from LLM output.
+
+    Handles code fences, prose around the JSON, trailing commas and output
+    truncated mid-value. Raises ValueError if no JSON can be recovered.
+    """
+    fence = _FENCE.search(text)
+    if fence:
+        text = fence.group(1)
+        fixes["code_fence"] += 1
+
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("No JSON object found")
+    if text[:start].strip():
+        fixes["surrounding_prose"] += 1
+
+    body, closers, safe_points, complete = _scan(text, start)
+    if complete:
+        if text[start + len(body):].strip():
+            fixes["surrounding_prose"] += 1
+        return _loads(body, fixes)
+
+    fixes["truncated"] += 1
+    # Close the value as-is first; otherwise cut back to the last complete element
+    candidates = [_close(body, closers)]
+    candidates += [body[:pos].rstrip().rstrip(",") + "".join(reversed(stack)) for pos, stack in reversed(safe_points)]
+    for candidate in candidates:
+        try:
+            return _loads(candidate, fixes)
+        except ValueError:
+            continue
+    raise ValueError("Truncated JSON could not be closed")
+
+
+def coerce_model(data: Any, model: type[BaseModel], fixes: Counter) -> Any:
+    if not isinstance(data, dict):
+        return data
+    coerced = dict(data)
+    for name, field in model.model_fields.items():
+        if name in coerced:
+            coerced[name] = coerce_value(coerced[name], field.annotation, fixes, name)
+    return coerced
+
+
+def coerce_value(value: Any, annotation: Any, fixes: Counter, field_name: str = "") -> Any:
+    """
+    Coerce a JSON value towards annotation; values that cannot be coerced are returned unchanged.
+    """
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+
+    if origin in (Union, types.UnionType):
+        optional = type(None) in args
+        inner = [arg for arg in args if arg is not type(None)]
+        if value is None and optional:
+            return None
+        coerced = coerce_value(value, inner[0], fixes, field_name) if len(inner) == 1 else value
+        # Unparseable optional scalars (e.g. "unknown" dates) become null rather than failing
+        if optional and inner[0] in (date, bool, int) and not isinstance(coerced, inner[0]):
+            fixes[f"nulled_{field_name or 'value'}"] += 1
+            return None
+        return coerced
+
+    if origin is list:
+        item_type = args[0] if args else Any
+        if value is None:
+            return value
+        if not isinstance(value, list):
+            fixes["wrapped_list"] += 1
+            value = [value]
+        if isinstance(item_type, type) and issubclass(item_type, BaseModel):
+            return _valid_items(value, item_type, fixes)
+        return [coerce_value(item, item_type, fixes, field_name) for item in value]
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return coerce_model(value, annotation, fixes)
+    if annotation is bool and not isinstance(value, bool):
+        return _coerce_bool(value, fixes)
+    if annotation is int and not isinstance(value, bool) and not isinstance(value, int):
+        return _coerce_int(value, fixes, field_name)
+    if annotation is date and not isinstance(value, date):
+        return _coerce_date(value, fixes)
+    if annotation is str and isinstance(value, (int, float)) and not isinstance(value, bool):
+        fixes["coerced_str"] += 1
+        return str(value)
+    return value
+
+
+def _scan(text: str, start: int) -> tuple[str, list[str], list[tuple[int, list[str]]], bool]:
+    """
+    Walk a JSON value from start, tracking open brackets outside strings.
+
+    Returns the scanned text (relative to start), the closers still open,
+    positions after which the value can be cut and closed, and whether the
+    value was complete.
+    """
+    closers: list[str] = []
+    safe_points: list[tuple[int, list[str]]] = []
+    in_string = escaped = False
+
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+            safe_points.append((pos + 1 - start, list(closers)))
+        elif char in "}]":
+            if closers:
+                closers.pop()
+            if not closers:
+                return text[start:pos + 1], [], safe_points, True
+        elif char == ",":
+            safe_points.append((pos - start, list(closers)))
+
+    body = text[start:]
+    if in_string:
+        body += '"'
+    return body, closers, safe_points, False
+
+
+def _close(body: str, closers: list[str]) -> str:
+    return body.rstrip().rstrip(",:") + "".join(reversed(closers))
+
+
+def _loads(text: str, fixes: Counter) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    cleaned = _strip_trailing_commas(text)
+    if cleaned != text:
+        fixes["trailing_comma"] += 1
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError as e:
+        raise ValueError(str(e))
+
+
+def _strip_trailing_commas(text: str) -> str:
+    out = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "}]":
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+        out.append(char)
+    return "".join(out)
+
+
+def _wrap_list(data: Any, model: type[BaseModel], fixes: Counter) -> Any:
+    """
+    Wrap a bare array into the model's only list field, e.g. [...] -> {"jobs": [...]}.
+    """
+    if not isinstance(data, list):
+        return data
+    list_fields = [name for name, field in model.model_fields.items() if get_origin(field.annotation) is list]
+    if len(list_fields) != 1:
+        raise ValueError(f"Cannot map a JSON array to {model.__name__}")
+    fixes["wrapped_object"] += 1
+    return {list_fields[0]: data}
+
+
+def _valid_items(items: list, model: type[BaseModel], fixes: Counter) -> list:
+    """
+    Keep the items that validate; raise ValueError if none of a non-empty list do.
+
+    An output whose every item is invalid is not repaired into an empty
+    result, so the LLM conversion still gets a chance.
+    """
+    valid = []
+    for item in items:
+        try:
+            valid.append(model.model_validate(coerce_model(item, model, fixes)))
+        except (ValidationError, TypeError, ValueError):
+            fixes["dropped_items"] += 1
+    if items and not valid:
+        raise ValueError(f"No valid {model.__name__} items")
+    return valid
+
+
+def _coerce_bool(value: Any, fixes: Counter) -> Any:
+    if isinstance(value, str):
+        normalized = value.strip().lower()
+        if normalized in TRUE_VALUES or normalized in FALSE_VALUES:
+            fixes["coerced_bool"] += 1
+            return normalized in TRUE_VALUES
+    return value
+
+
+def _coerce_int(value: Any, fixes: Counter, field_name: str) -> Any:
+    """
+    Parse "4", "4.0", 4.5 or "4/5"; match scores on another scale are rescaled to 1-5.
+    """
+    if isinstance(value, float):
+        fixes["coerced_int"] += 1
+        return round(value)
+    if not isinstance(value, str):
+        return value
+
+    match = _SCORE.search(value)
+    if not match:
+        return value
+    number = float(match.group(1))
+    scale = float(match.group(2)) if match.group(2) else None
+    if scale and field_name == "match_score" and scale != MATCH_SCORE_SCALE:
+        number = number / scale * MATCH_SCORE_SCALE
+    fixes["coerced_int"] += 1
+    return round(number)
+
+
+def _coerce_date(value: Any, fixes: Counter) -> Any:
+    if isinstance(value, datetime):
+        return value.date()
+    if not isinstance(value, str):
+        return value
+
+    text = value.strip()
+    if _ISO_DATE.fullmatch(text):
+        # Already valid for pydantic, so not counted as a repair; parsed so
+        # Optional fields don't mistake it for an unparseable value
+        try:
+            return date.fromisoformat(text)
+        except ValueError:
+            return value
+
+    parsed = None
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt).date()
+            break
+        except ValueError:
+            continue
+
+    if parsed is None:
+        korean = _KOREAN_DATE.search(text)
+        days_ago = _DAYS_AGO.search(text)
+        lowered = text.lower()
+        if korean:
+            parsed = _safe_date(*(int(part) for part in korean.groups()))
+        elif days_ago:
+            parsed = date.today() - timedelta(days=int(days_ago.group(1)))
+        elif lowered in ("today", "오늘"):
+            parsed = date.today()
+        elif lowered in ("yesterday", "어제"):
+            parsed = date.today() - timedelta(days=1)
+
+    if parsed is None:
+        return value
+    fixes["coerced_date"] += 1
+    return parsed
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
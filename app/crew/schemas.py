@@ -45,6 +45,13 @@ class JobList(BaseModel):
     jobs: List[Job]
 
 
+class SearchDelta(BaseModel):
+    new: List[str] = []
+    updated: List[str] = []
+    removed: List[str] = []
+    cached: int = 0
+
+
 class RankedJob(BaseModel):
     job: Job
     match_score: int
@@ -61,5 +68,13 @@ class ChosenJob(BaseModel):
     reason: str
 
 
+class DocumentSection(BaseModel):
+    id: str
+    title: str
+    content: str
+    content_hash: str
+    input_hash: str
+
+
 # Rebuild models for forward references
 CrewResult.model_rebuild()
\ No newline at end of file
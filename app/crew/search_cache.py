@@ -0,0 +1,122 @@
+"""
+Saved searches for incremental job search.
+
+Each normalized query keeps the search result pages it has already seen,
+a hash of their content, and the jobs extracted from them, so repeat
+searches only send new or changed pages to the LLM.
+"""
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.crew.schemas import Job
+
+SEARCH_CACHE_DIR = Path("output") / "searches"
+
+# Pages not seen in a search for this long are dropped from the cache
+PAGE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+_lock = threading.Lock()
+
+
+def normalize_query(
+    level: str,
+    position: str,
+    location: str,
+    job_sites: Optional[list[str]] = None,
+) -> str:
+    """
+    Build a stable key for a search, ignoring case, spacing and site order.
+    """
+    parts = [" ".join(value.lower().split()) for value in (level, position, location)]
+    sites = sorted({site.lower().strip() for site in job_sites or []})
+    return "|".join(parts + [",".join(sites)])
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def job_key(job: Job) -> str:
+    """
+    Identity of a posting across searches.
+
+    The posting URL alone is not unique: postings without their own link
+    fall back to the listing page url or "Unknown".
+    """
+    return " | ".join(" ".join(part.split()) for part in (job.job_posting_url, job.job_title, job.company_name))
+
+
+class SavedSearch:
+    """Seen pages and the jobs extracted from each, for one normalized query."""
+
+    def __init__(self, query_key: str):
+        self.query_key = query_key
+        self.path = SEARCH_CACHE_DIR / f"{content_hash(query_key)[:16]}.json"
+        # page url -> {"content_hash", "jobs": list[Job], "last_seen"}
+        self.pages: dict[str, dict] = {}
+        # job keys returned by the previous run, used to compute the delta
+        self.last_job_keys: list[str] = []
+
+    @classmethod
+    def load(cls, query_key: str) -> "SavedSearch":
+        saved = cls(query_key)
+        with _lock:
+            if not saved.path.exists():
+                return saved
+            data = json.loads(saved.path.read_text(encoding="utf-8"))
+
+        saved.pages = {
+            url: {**page, "jobs": [Job(**job) for job in page["jobs"]]}
+            for url, page in data.get("pages", {}).items()
+            # Pages saved in the older URL-keyed format are simply re-extracted
+            if "jobs" in page
+        }
+        saved.last_job_keys = data.get("last_job_keys", [])
+        return saved
+
+    def save(self):
+        self._prune()
+        data = {
+            "query": self.query_key,
+            "pages": {
+                url: {**page, "jobs": [job.model_dump(mode="json") for job in page["jobs"]]}
+                for url, page in self.pages.items()
+            },
+            "last_job_keys": self.last_job_keys,
+        }
+        with _lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            tmp_path.replace(self.path)
+
+    def is_fresh(self, page_url: str, page_hash: str) -> bool:
+        """
+        Whether the page was already extracted with identical content.
+        """
+        page = self.pages.get(page_url)
+        return page is not None and page["content_hash"] == page_hash
+
+    def jobs_for_page(self, page_url: str) -> list[Job]:
+        return list(self.pages.get(page_url, {}).get("jobs", []))
+
+    def record_page(self, page_url: str, page_hash: str, jobs: list[Job]):
+        self.pages[page_url] = {
+            "content_hash": page_hash,
+            "jobs": list(jobs),
+            "last_seen": time.time(),
+        }
+
+    def touch_page(self, page_url: str):
+        self.pages[page_url]["last_seen"] = time.time()
+
+    def _prune(self):
+        cutoff = time.time() - PAGE_TTL_SECONDS
+        self.pages = {
+            url: page for url, page in self.pages.items()
+            if page["last_seen"] >= cutoff
+        }
@@ -0,0 +1,137 @@
+"""
+Addressable sections of generated markdown documents.
+
+Resume and interview prep outputs are split on their `## ` headings. Each
+section carries a hash of its content and of the inputs it depends on, so
+regeneration can rebuild only the sections whose inputs changed and reuse
+previously generated content for the rest.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.crew.schemas import DocumentSection
+
+RESUME = "resume"
+INTERVIEW = "interview"
+
+# Inputs each interview prep section depends on (see interview_prep_task)
+INTERVIEW_SECTION_INPUTS = {
+    "job-overview": ["chosen_job"],
+    "why-this-job-is-a-fit": ["chosen_job", "rewritten_resume"],
+    "resume-highlights-for-this-role": ["chosen_job", "rewritten_resume"],
+    "company-summary": ["company_research"],
+    "predicted-interview-questions": ["chosen_job", "company_research"],
+    "questions-to-ask-them": ["company_research"],
+    "concepts-to-know-review": ["chosen_job"],
+}
+
+DOCUMENT_INPUTS = {
+    RESUME: ["chosen_job", "resume_text"],
+    INTERVIEW: ["chosen_job", "rewritten_resume", "company_research", "resume_text"],
+}
+
+MAX_CACHED_SECTIONS = 1000
+
+_HEADING = re.compile(r"^##\s+(.+?)\s*#*\s*$")
+
+
+def section_id(title: str) -> str:
+    return re.sub(r"[^\w]+", "-", title.lower()).strip("-")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def section_inputs(kind: str, sid: str) -> list[str]:
+    """
+    Names of the inputs a section depends on; unknown sections depend on all.
+    """
+    if kind == INTERVIEW and sid in INTERVIEW_SECTION_INPUTS:
+        return INTERVIEW_SECTION_INPUTS[sid]
+    return DOCUMENT_INPUTS[kind]
+
+
+def input_hash(kind: str, sid: str, inputs: dict[str, str]) -> str:
+    parts = [kind, sid] + [f"{name}={inputs.get(name, '')}" for name in section_inputs(kind, sid)]
+    return content_hash("\x1f".join(parts))
+
+
+def split_sections(markdown: str) -> tuple[str, list[tuple[str, str]]]:
+    """
+    Split a document into its preamble and (title, body) pairs per `## ` heading.
+    """
+    preamble: list[str] = []
+    sections: list[tuple[str, list[str]]] = []
+    in_code = False
+
+    for line in markdown.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else _HEADING.match(line)
+        if match:
+            sections.append((match.group(1), []))
+        elif sections:
+            sections[-1][1].append(line)
+        else:
+            preamble.append(line)
+
+    return "\n".join(preamble).strip(), [(title, "\n".join(body).strip()) for title, body in sections]
+
+
+def assemble(preamble: str, sections: list[DocumentSection]) -> str:
+    parts = [preamble] if preamble else []
+    parts += [f"## {section.title}\n\n{section.content}".rstrip() for section in sections]
+    return "\n\n".join(parts) + "\n"
+
+
+def make_section(kind: str, title: str, content: str, inputs: dict[str, str]) -> DocumentSection:
+    sid = section_id(title)
+    return DocumentSection(
+        id=sid,
+        title=title,
+        content=content,
+        content_hash=content_hash(content),
+        input_hash=input_hash(kind, sid, inputs),
+    )
+
+
+class SectionCache:
+    """Generated section content keyed by document kind, section and input hash."""
+
+    def __init__(self, max_size: int = MAX_CACHED_SECTIONS):
+        self.max_size = max_size
+        self._items: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, section: DocumentSection) -> Optional[str]:
+        key = (kind, section.id, section.input_hash)
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, kind: str, section: DocumentSection):
+        with self._lock:
+            self._items[(kind, section.id, section.input_hash)] = section.content
+            self._items.move_to_end((kind, section.id, section.input_hash))
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+section_cache = SectionCache()
+
+
+def index_document(kind: str, markdown: str, inputs: dict[str, str]) -> list[DocumentSection]:
+    """
+    Split a freshly generated document into sections and cache them.
+    """
+    _, parts = split_sections(markdown)
+    sections = [make_section(kind, title, body, inputs) for title, body in parts]
+    for section in sections:
+        section_cache.put(kind, section)
+    return sections
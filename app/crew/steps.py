@@ -4,166 +4,437 @@ Step-by-step crew execution for incremental processing.
 import dotenv
 dotenv.load_dotenv()
 
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from crewai import Crew, Agent, Task
-from crewai.knowledge.source.string_knowledge_source import StringKnowledgeSource
 
-from app.crew.tools import create_web_search_tool
-from app.crew.schemas import JobList, RankedJobList, ChosenJob
+from app.crew.tools import create_web_search_tool, search_web, clean_search_results, build_search_query
+from app.crew.schemas import Job, JobList, RankedJobList, ChosenJob, SearchDelta, DocumentSection
+from app.crew.search_cache import SavedSearch, normalize_query, content_hash, job_key
+from app.crew.cancellation import CancelToken, crew_callbacks
+from app.crew.llm_router import llm_router
+from app.crew.knowledge import ResumeKnowledge, with_resume
+from app.crew.repair import RepairingConverter
+from app.crew import sections
 
+import json
 import yaml
 from pathlib import Path
 
 CONFIG_DIR = Path(__file__).parent / "config"
 
+SEARCH_RESULT_LIMIT = 10
+SECTION_WORKERS = 4
+
 
 def load_config(filename: str) -> dict:
     with open(CONFIG_DIR / filename, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
 
-class JobSearchStep:
-    """Step 1: Search for job postings."""
+class BaseStep:
+    """Shared config loading and routed single-task crew execution."""
 
-    def __init__(self, job_sites: Optional[list[str]] = None):
+    def __init__(self, cancel_token: Optional[CancelToken] = None):
         self.agents_config = load_config("agents.yaml")
         self.tasks_config = load_config("tasks.yaml")
-        self.web_search_tool = create_web_search_tool(domains=job_sites)
+        self.cancel_token = cancel_token
+
+    def _run_task(
+        self,
+        agent_name: str,
+        task_name: str,
+        inputs: dict,
+        agent_kwargs: Optional[dict] = None,
+        task_kwargs: Optional[dict] = None,
+        knowledge: Optional[ResumeKnowledge] = None,
+    ) -> Task:
+        """
+        Run one task in its own crew on the LLM tier routed for it.
+
+        Falls back to the next tier on errors or timeouts and returns the
+        executed task; its result is available as `task.output`. With
+        `knowledge`, the resume (or its chunks relevant to the task) is
+        inlined into the agent backstory. Structured outputs are repaired
+        locally before falling back to an LLM conversion.
+        """
+        executed = {}
+        agent_kwargs = dict(agent_kwargs or {})
+        task_kwargs = dict(task_kwargs or {})
+        if "output_pydantic" in task_kwargs:
+            task_kwargs.setdefault("converter_cls", RepairingConverter)
+
+        if knowledge is not None:
+            query = "\n".join([self.tasks_config[task_name]["description"], *map(str, inputs.values())])
+            inputs = {**inputs, **knowledge.inputs(query)}
+            agent_kwargs["backstory"] = with_resume(self.agents_config[agent_name]["backstory"])
+
+        def execute(llm):
+            agent = Agent(
+                config=self.agents_config[agent_name],
+                llm=llm,
+                **agent_kwargs
+            )
+            task = Task(
+                config=self.tasks_config[task_name],
+                agent=agent,
+                **task_kwargs
+            )
+            crew = Crew(agents=[agent], tasks=[task], verbose=True, **crew_callbacks(self.cancel_token))
+            result = crew.kickoff(inputs=inputs)
+            executed["task"] = task
+            return result
+
+        llm_router.run(agent_name, task_name, execute)
+        return executed["task"]
+
+
+class JobSearchStep(BaseStep):
+    """Step 1: Search for job postings."""
+
+    def __init__(self, job_sites: Optional[list[str]] = None, cancel_token: Optional[CancelToken] = None):
+        super().__init__(cancel_token=cancel_token)
+        self.job_sites = job_sites
+        self.web_search_tool = create_web_search_tool(domains=job_sites, cancel_token=cancel_token)
 
     def run(self, level: str, position: str, location: str) -> JobList:
-        agent = Agent(
-            config=self.agents_config["job_search_agent"],
-            tools=[self.web_search_tool]
+        task = self._run_task(
+            "job_search_agent",
+            "job_extraction_task",
+            inputs={
+                "level": level,
+                "position": position,
+                "location": location,
+                "search_query": build_search_query(level, position, location),
+            },
+            agent_kwargs={"tools": [self.web_search_tool]},
+            task_kwargs={"output_pydantic": JobList},
         )
 
-        task = Task(
-            config=self.tasks_config["job_extraction_task"],
-            agent=agent,
-            output_pydantic=JobList
+        return task.output.pydantic
+
+    def run_incremental(self, level: str, position: str, location: str) -> tuple[JobList, SearchDelta]:
+        """
+        Search using the saved search for this query.
+
+        Only pages that are new or whose content changed since the last run
+        are sent to the LLM; jobs from unchanged pages come from the cache.
+        On a changed page, postings already extracted whose own link is still
+        on the page are kept and skipped during extraction.
+        """
+        saved = SavedSearch.load(normalize_query(level, position, location, self.job_sites))
+
+        if self.cancel_token:
+            self.cancel_token.check()
+
+        query = build_search_query(level, position, location)
+        response = search_web(query, domains=self.job_sites, limit=SEARCH_RESULT_LIMIT)
+        if not response.get("success"):
+            raise RuntimeError(f"Web search failed: {response}")
+        pages = [page for page in clean_search_results(response, keep_links=True) if page["url"]]
+
+        page_hashes = {page["url"]: content_hash(page["markdown"]) for page in pages}
+        stale_pages = [
+            page for page in pages
+            if not saved.is_fresh(page["url"], page_hashes[page["url"]])
+        ]
+
+        known = {page["url"]: self._known_postings(saved, page) for page in stale_pages}
+        known_urls = sorted({job.job_posting_url for jobs in known.values() for job in jobs})
+
+        extracted = self._extract(level, position, location, stale_pages, known_urls) if stale_pages else []
+        for page_url, page_jobs in self._group_by_page(stale_pages, extracted).items():
+            extracted_keys = {job_key(job) for job in page_jobs}
+            kept = [job for job in known[page_url] if job_key(job) not in extracted_keys]
+            saved.record_page(page_url, page_hashes[page_url], kept + page_jobs)
+
+        current_jobs: dict[str, Job] = {}
+        for page in pages:
+            saved.touch_page(page["url"])
+            for job in saved.jobs_for_page(page["url"]):
+                current_jobs.setdefault(job_key(job), job)
+
+        previous_keys = set(saved.last_job_keys)
+        extracted_keys = {job_key(job) for job in extracted}
+        delta = SearchDelta(
+            new=[key for key in current_jobs if key not in previous_keys],
+            updated=[key for key in current_jobs if key in previous_keys and key in extracted_keys],
+            removed=[key for key in saved.last_job_keys if key not in current_jobs],
+            cached=len([key for key in current_jobs if key not in extracted_keys]),
         )
 
-        crew = Crew(agents=[agent], tasks=[task], verbose=True)
-        result = crew.kickoff(inputs={
-            "level": level,
-            "position": position,
-            "location": location,
-        })
-
-        return result.pydantic
-
+        saved.last_job_keys = list(current_jobs)
+        saved.save()
+
+        return JobList(jobs=list(current_jobs.values())), delta
+
+    def _extract(
+        self,
+        level: str,
+        position: str,
+        location: str,
+        pages: list[dict],
+        known_urls: list[str],
+    ) -> list[Job]:
+        task = self._run_task(
+            "job_search_agent",
+            "job_extraction_from_results_task",
+            inputs={
+                "level": level,
+                "position": position,
+                "location": location,
+                "search_results": json.dumps(pages, ensure_ascii=False),
+                "known_job_urls": ", ".join(known_urls) or "없음",
+            },
+            task_kwargs={"output_pydantic": JobList},
+        )
 
-class JobMatchStep:
+        return task.output.pydantic.jobs
+
+    @staticmethod
+    def _known_postings(saved: SavedSearch, page: dict) -> list[Job]:
+        """
+        Previously extracted jobs of a page that can be kept without re-extraction.
+
+        Only jobs with their own posting link qualify, and only while that
+        link is still on the page; links shared by several jobs (e.g. the
+        listing page itself) do not identify a posting.
+        """
+        jobs = saved.jobs_for_page(page["url"])
+        url_counts = Counter(job.job_posting_url for job in jobs)
+        return [
+            job for job in jobs
+            if url_counts[job.job_posting_url] == 1
+            and job.job_posting_url.startswith("http")
+            and job.job_posting_url != page["url"]
+            and job.job_posting_url in page["markdown"]
+        ]
+
+    @staticmethod
+    def _group_by_page(pages: list[dict], jobs: list[Job]) -> dict[str, list[Job]]:
+        """
+        Attribute extracted jobs to the search result page they came from.
+
+        Jobs that cannot be attributed are attached to every page of the batch,
+        so they stay visible for as long as any of those pages is returned.
+        """
+        grouped: dict[str, list[Job]] = {page["url"]: [] for page in pages}
+        unattributed = []
+
+        for job in jobs:
+            page_url = next(
+                (url for url in (job.source_listing_url, job.job_posting_url) if url in grouped),
+                None,
+            )
+            if page_url:
+                grouped[page_url].append(job)
+            else:
+                unattributed.append(job)
+
+        for page_jobs in grouped.values():
+            page_jobs.extend(unattributed)
+
+        return grouped
+
+
+class JobMatchStep(BaseStep):
     """Step 2: Match and rank jobs against resume, then select best one."""
 
-    def __init__(self, resume_text: str):
-        self.agents_config = load_config("agents.yaml")
-        self.tasks_config = load_config("tasks.yaml")
-        self.resume_knowledge = StringKnowledgeSource(content=resume_text)
+    def __init__(self, resume_text: str, cancel_token: Optional[CancelToken] = None):
+        super().__init__(cancel_token=cancel_token)
+        self.resume_knowledge = ResumeKnowledge(resume_text)
 
     def run(self, jobs: JobList) -> tuple[RankedJobList, ChosenJob]:
-        agent = Agent(
-            config=self.agents_config["job_matching_agent"],
-            knowledge_sources=[self.resume_knowledge]
-        )
-
-        matching_task = Task(
-            config=self.tasks_config["job_matching_task"],
-            agent=agent,
-            output_pydantic=RankedJobList
+        # Matching and selection run as separate crews so each can use its own LLM tier
+        inputs = {"jobs": jobs.model_dump_json()}
+
+        matching_task = self._run_task(
+            "job_matching_agent",
+            "job_matching_task",
+            inputs=inputs,
+            task_kwargs={"output_pydantic": RankedJobList},
+            knowledge=self.resume_knowledge,
         )
 
-        selection_task = Task(
-            config=self.tasks_config["job_selection_task"],
-            agent=agent,
-            output_pydantic=ChosenJob,
-            context=[matching_task]
+        selection_task = self._run_task(
+            "job_matching_agent",
+            "job_selection_task",
+            inputs=inputs,
+            knowledge=self.resume_knowledge,
+            task_kwargs={"output_pydantic": ChosenJob, "context": [matching_task]},
         )
 
-        crew = Crew(agents=[agent], tasks=[matching_task, selection_task], verbose=True)
-        result = crew.kickoff(inputs={"jobs": jobs.model_dump_json()})
-
-        ranked_jobs = result.tasks_output[0].pydantic
-        chosen_job = result.tasks_output[1].pydantic
+        ranked_jobs = matching_task.output.pydantic
+        chosen_job = selection_task.output.pydantic
 
         return ranked_jobs, chosen_job
 
 
-class ResumeOptimizeStep:
+class ResumeOptimizeStep(BaseStep):
     """Step 3: Optimize resume for the chosen job."""
 
-    def __init__(self, resume_text: str):
-        self.agents_config = load_config("agents.yaml")
-        self.tasks_config = load_config("tasks.yaml")
-        self.resume_knowledge = StringKnowledgeSource(content=resume_text)
+    def __init__(self, resume_text: str, cancel_token: Optional[CancelToken] = None):
+        super().__init__(cancel_token=cancel_token)
+        self.resume_knowledge = ResumeKnowledge(resume_text)
 
     def run(self, chosen_job: ChosenJob) -> str:
-        agent = Agent(
-            config=self.agents_config["resume_optimization_agent"],
-            knowledge_sources=[self.resume_knowledge]
-        )
-
-        task = Task(
-            config=self.tasks_config["resume_rewriting_task"],
-            agent=agent,
+        task = self._run_task(
+            "resume_optimization_agent",
+            "resume_rewriting_task",
+            inputs={"chosen_job": chosen_job.model_dump_json()},
+            knowledge=self.resume_knowledge,
         )
 
-        crew = Crew(agents=[agent], tasks=[task], verbose=True)
-        result = crew.kickoff(inputs={"chosen_job": chosen_job.model_dump_json()})
+        return task.output.raw
 
-        return result.raw
 
-
-class CompanyResearchStep:
+class CompanyResearchStep(BaseStep):
     """Step 4: Research the company."""
 
-    def __init__(self, resume_text: str):
-        self.agents_config = load_config("agents.yaml")
-        self.tasks_config = load_config("tasks.yaml")
-        self.resume_knowledge = StringKnowledgeSource(content=resume_text)
-        self.web_search_tool = create_web_search_tool()
+    def __init__(self, resume_text: str, cancel_token: Optional[CancelToken] = None):
+        super().__init__(cancel_token=cancel_token)
+        self.resume_knowledge = ResumeKnowledge(resume_text)
+        self.web_search_tool = create_web_search_tool(cancel_token=cancel_token)
 
     def run(self, chosen_job: ChosenJob) -> str:
-        agent = Agent(
-            config=self.agents_config["company_research_agent"],
-            tools=[self.web_search_tool],
-            knowledge_sources=[self.resume_knowledge]
+        task = self._run_task(
+            "company_research_agent",
+            "company_research_task",
+            inputs={"chosen_job": chosen_job.model_dump_json()},
+            agent_kwargs={"tools": [self.web_search_tool]},
+            knowledge=self.resume_knowledge,
         )
 
-        task = Task(
-            config=self.tasks_config["company_research_task"],
-            agent=agent,
-        )
-
-        crew = Crew(agents=[agent], tasks=[task], verbose=True)
-        result = crew.kickoff(inputs={"chosen_job": chosen_job.model_dump_json()})
-
-        return result.raw
+        return task.output.raw
 
 
-class InterviewPrepStep:
+class InterviewPrepStep(BaseStep):
     """Step 5: Prepare for interview."""
 
-    def __init__(self, resume_text: str):
-        self.agents_config = load_config("agents.yaml")
-        self.tasks_config = load_config("tasks.yaml")
-        self.resume_knowledge = StringKnowledgeSource(content=resume_text)
+    def __init__(self, resume_text: str, cancel_token: Optional[CancelToken] = None):
+        super().__init__(cancel_token=cancel_token)
+        self.resume_knowledge = ResumeKnowledge(resume_text)
 
     def run(self, chosen_job: ChosenJob, rewritten_resume: str, company_research: str) -> str:
-        agent = Agent(
-            config=self.agents_config["interview_prep_agent"],
-            knowledge_sources=[self.resume_knowledge]
+        task = self._run_task(
+            "interview_prep_agent",
+            "interview_prep_task",
+            inputs={
+                "chosen_job": chosen_job.model_dump_json(),
+                "rewritten_resume": rewritten_resume,
+                "company_research": company_research,
+            },
+            knowledge=self.resume_knowledge,
         )
 
-        task = Task(
-            config=self.tasks_config["interview_prep_task"],
-            agent=agent,
+        return task.output.raw
+
+
+class SectionRegenerateStep(BaseStep):
+    """Regenerate only the stale sections of a resume or interview prep document."""
+
+    AGENTS = {
+        sections.RESUME: "resume_optimization_agent",
+        sections.INTERVIEW: "interview_prep_agent",
+    }
+    DOCUMENT_KINDS = {
+        sections.RESUME: "맞춤형 이력서",
+        sections.INTERVIEW: "면접 준비",
+    }
+
+    def __init__(self, resume_text: str, cancel_token: Optional[CancelToken] = None):
+        super().__init__(cancel_token=cancel_token)
+        self.resume_text = resume_text
+        self.resume_knowledge = ResumeKnowledge(resume_text)
+
+    def run(
+        self,
+        kind: str,
+        document: str,
+        inputs: dict[str, str],
+        previous: Optional[dict[str, str]] = None,
+        regenerate: Optional[list[str]] = None,
+    ) -> tuple[str, list[DocumentSection], dict]:
+        """
+        Rebuild requested sections and sections whose input hash changed.
+
+        Args:
+            kind: sections.RESUME or sections.INTERVIEW
+            document: The current (possibly user-edited) markdown document
+            inputs: Latest inputs of the document, e.g. chosen_job JSON
+            previous: Section id -> input_hash from the previous response
+            regenerate: Section ids to regenerate regardless of their inputs
+
+        Returns the reassembled document, its sections and a report of
+        regenerated / reused (from cache) / kept section ids. Sections whose
+        inputs did not change keep their current, possibly edited, content.
+        """
+        inputs = {**inputs, "resume_text": self.resume_text}
+        previous = previous or {}
+        requested = set(regenerate or [])
+
+        preamble, parts = sections.split_sections(document)
+        current = [sections.make_section(kind, title, body, inputs) for title, body in parts]
+
+        unknown = requested - {section.id for section in current}
+        if unknown:
+            raise ValueError(f"Unknown sections: {', '.join(sorted(unknown))}")
+
+        result = list(current)
+        report = {"regenerated": [], "reused": [], "kept": []}
+        stale = []
+
+        for index, section in enumerate(current):
+            inputs_changed = section.id in previous and previous[section.id] != section.input_hash
+            if section.id in requested:
+                stale.append(index)
+            elif inputs_changed:
+                cached = sections.section_cache.get(kind, section)
+                if cached is None:
+                    stale.append(index)
+                else:
+                    result[index] = sections.make_section(kind, section.title, cached, inputs)
+                    report["reused"].append(section.id)
+            else:
+                report["kept"].append(section.id)
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(len(stale), SECTION_WORKERS)) as pool:
+                futures = {
+                    index: pool.submit(self._regenerate_section, kind, document, current[index], inputs)
+                    for index in stale
+                }
+                for index, future in futures.items():
+                    section = sections.make_section(kind, current[index].title, future.result(), inputs)
+                    sections.section_cache.put(kind, section)
+                    result[index] = section
+                    report["regenerated"].append(section.id)
+
+        return sections.assemble(preamble, result), result, report
+
+    def _regenerate_section(self, kind: str, document: str, section: DocumentSection, inputs: dict[str, str]) -> str:
+        section_inputs = "\n\n".join(
+            f"### {name}\n{inputs[name]}"
+            for name in sections.section_inputs(kind, section.id)
+            if name != "resume_text" and inputs.get(name)
         )
 
-        crew = Crew(agents=[agent], tasks=[task], verbose=True)
-        result = crew.kickoff(inputs={
-            "chosen_job": chosen_job.model_dump_json(),
-            "rewritten_resume": rewritten_resume,
-            "company_research": company_research,
-        })
+        task = self._run_task(
+            self.AGENTS[kind],
+            "section_regeneration_task",
+            inputs={
+                "document_kind": self.DOCUMENT_KINDS[kind],
+                "document": document,
+                "section_title": section.title,
+                "current_section": section.content,
+                "section_inputs": section_inputs,
+            },
+            knowledge=self.resume_knowledge,
+        )
 
-        return result.raw
+        content = task.output.raw.strip()
+        title, _, body = content.partition("\n")
+        if title.startswith("## "):
+            content = body.strip()
+        return content
@@ -7,13 +7,26 @@ import re
 from crewai.tools import tool
 from typing import Optional
 
+from app.crew.cancellation import CancelToken
 
-def create_web_search_tool(domains: Optional[list[str]] = None):
+# Shared by the search agent's task and incremental search so both run the same query
+SEARCH_QUERY_TEMPLATE = "{location} {level} {position} 채용"
+
+
+def build_search_query(level: str, position: str, location: str) -> str:
+    return SEARCH_QUERY_TEMPLATE.format(level=level, position=position, location=location)
+
+
+def create_web_search_tool(
+    domains: Optional[list[str]] = None,
+    cancel_token: Optional[CancelToken] = None,
+):
     """
     Create a web search tool with optional domain filtering.
 
     Args:
         domains: List of domains to search within (e.g., ["linkedin.com", "jobkorea.co.kr"])
+        cancel_token: Stops the search before calling Firecrawl once the run is cancelled
     """
     @tool
     def web_search_tool(query: str):
@@ -25,54 +38,83 @@ def create_web_search_tool(domains: Optional[list[str]] = None):
         Returns:
             A list of search results with the website content in Markdown format.
         """
-        url = "https://api.firecrawl.dev/v1/search"
-        api_key = os.getenv("FIRECRAWL_API_KEY")
-
-        # Add site: operator to query if domains are specified
-        search_query = query
-        if domains:
-            site_filter = " OR ".join([f"site:{domain}" for domain in domains])
-            search_query = f"({site_filter}) {query}"
-
-        payload = {
-            "query": search_query,
-            "limit": 5,
-            "scrapeOptions": {
-                "formats": ["markdown"]
-            }
-        }
-
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
+        if cancel_token:
+            cancel_token.check()
 
-        response = requests.post(url, json=payload, headers=headers)
-        response = response.json()
+        response = search_web(query, domains=domains)
 
         if not response.get("success"):
             return f"Error using tool: {response}"
 
-        cleaned_chunks = []
-        for result in response.get("data", []):
-            title = result.get("title", "")
-            result_url = result.get("url", "")
-            markdown = result.get("markdown", "")
+        return clean_search_results(response)
 
-            cleaned = re.sub(r'\\+|\n+', '', markdown).strip()
-            cleaned = re.sub(r"\[[^\]]+\]\([^\)]+\)|https?://[^\s]+", "", cleaned)
+    return web_search_tool
 
-            cleaned_result = {
-                "title": title,
-                "url": result_url,
-                "markdown": cleaned,
-            }
 
-            cleaned_chunks.append(cleaned_result)
+def search_web(query: str, domains: Optional[list[str]] = None, limit: int = 5) -> dict:
+    """
+    Run a Firecrawl search and return the raw response JSON.
 
-        return cleaned_chunks
+    Args:
+        query: The query to search the web for.
+        domains: List of domains to search within.
+        limit: Maximum number of results to scrape.
+    """
+    url = "https://api.firecrawl.dev/v1/search"
+    api_key = os.getenv("FIRECRAWL_API_KEY")
+
+    # Add site: operator to query if domains are specified
+    search_query = query
+    if domains:
+        site_filter = " OR ".join([f"site:{domain}" for domain in domains])
+        search_query = f"({site_filter}) {query}"
+
+    payload = {
+        "query": search_query,
+        "limit": limit,
+        "scrapeOptions": {
+            "formats": ["markdown"]
+        }
+    }
 
-    return web_search_tool
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+
+    response = requests.post(url, json=payload, headers=headers)
+    return response.json()
+
+
+def clean_search_results(response: dict, keep_links: bool = False) -> list[dict]:
+    """
+    Strip links and escape noise from Firecrawl search results.
+
+    With keep_links, links are kept as `text <url>` (images are still
+    dropped) so postings on a listing page keep their own URLs.
+    """
+    cleaned_chunks = []
+    for result in response.get("data", []):
+        title = result.get("title", "")
+        result_url = result.get("url", "")
+        markdown = result.get("markdown", "")
+
+        cleaned = re.sub(r'\\+|\n+', '', markdown).strip()
+        if keep_links:
+            cleaned = re.sub(r"!\[[^\]]*\]\([^\)]+\)", "", cleaned)
+            cleaned = re.sub(r"\[([^\]]+)\]\(([^\)\s]+)[^\)]*\)", r"\1 <\2>", cleaned)
+        else:
+            cleaned = re.sub(r"\[[^\]]+\]\([^\)]+\)|https?://[^\s]+", "", cleaned)
+
+        cleaned_result = {
+            "title": title,
+            "url": result_url,
+            "markdown": cleaned,
+        }
+
+        cleaned_chunks.append(cleaned_result)
+
+    return cleaned_chunks
 
 
 # Default tool without domain filtering (for backward compatibility)
@@ -5,7 +5,8 @@ from pathlib import Path
 import dotenv
 dotenv.load_dotenv()
 
-from app.routers import crew, steps
+from app.routers import crew, steps, stats, export
+from app.utils import export as export_pool
 
 
 @asynccontextmanager
@@ -13,9 +14,12 @@ async def lifespan(app: FastAPI):
     output_dir = Path("output")
     output_dir.mkdir(exist_ok=True)
     yield
+    export_pool.shutdown()
 
 
 app = FastAPI(title="Job Search Agent API", lifespan=lifespan)
 
 app.include_router(crew.router)
 app.include_router(steps.router)
+app.include_router(stats.router)
+app.include_router(export.router)
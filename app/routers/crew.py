@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request, UploadFile, File, Form
 from pathlib import Path
 from typing import Optional
 import uuid
 import json
 
-from app.crew.crew import JobSearchCrew
+from app.crew.pipeline import CrewPipeline
+from app.crew.cancellation import CancelToken, RunCancelled
 from app.crew.schemas import (
     CrewResult,
     JobList,
@@ -12,12 +13,21 @@ from app.crew.schemas import (
     ChosenJob,
 )
 from app.utils.pdf import extract_text_from_pdf
+from app.utils.cancellation import run_cancellable
+from app.utils.http import compact_response
 
 router = APIRouter(prefix="/crew", tags=["crew (deprecated)"])
 
 # In-memory storage for task results
 tasks: dict[str, dict] = {}
 
+# Markdown-producing tasks and the CrewResult field they fill
+MARKDOWN_TASKS = {
+    "resume_rewriting_task": "rewritten_resume",
+    "company_research_task": "company_research",
+    "interview_prep_task": "interview_prep",
+}
+
 
 @router.post("/kickoff", deprecated=True)
 async def kickoff_crew(
@@ -28,21 +38,30 @@ async def kickoff_crew(
     resume_text: Optional[str] = Form(None),
     resume_file: Optional[UploadFile] = File(None),
     job_sites: Optional[str] = Form(None),
+    timeout: Optional[float] = Form(None, gt=0),
 ):
     """
     [DEPRECATED] 단계별 API (/crew/step/*) 사용을 권장합니다.
 
     비동기로 전체 파이프라인을 실행합니다. task_id를 반환하며, 이를 통해 진행 상태를 확인할 수 있습니다.
+    timeout(초)을 지정하면 해당 시간이 지난 뒤 실행이 취소됩니다.
     """
     resume_content = await _get_resume_content(resume_text, resume_file)
     sites_list = _parse_job_sites(job_sites)
 
     task_id = str(uuid.uuid4())
-    tasks[task_id] = {"status": "running", "result": None, "error": None}
+    cancel_token = CancelToken(timeout=timeout)
+    tasks[task_id] = {
+        "status": "running",
+        "result": None,
+        "error": None,
+        "cancel_token": cancel_token,
+    }
 
     background_tasks.add_task(
         run_crew_task,
         task_id,
+        cancel_token,
         level,
         position,
         location,
@@ -55,6 +74,7 @@ async def kickoff_crew(
 
 @router.post("/kickoff/sync", response_model=CrewResult, deprecated=True)
 async def kickoff_crew_sync(
+    request: Request,
     level: str = Form(...),
     position: str = Form(...),
     location: str = Form(...),
@@ -70,27 +90,38 @@ async def kickoff_crew_sync(
     resume_content = await _get_resume_content(resume_text, resume_file)
     sites_list = _parse_job_sites(job_sites)
 
-    try:
-        crew_instance = JobSearchCrew(
+    def run(cancel_token: CancelToken):
+        pipeline = CrewPipeline(
+            run_id=str(uuid.uuid4()),
             resume_text=resume_content,
             job_sites=sites_list,
-        ).crew()
-        result = crew_instance.kickoff(
+            cancel_token=cancel_token,
+            # The sync endpoint has no task id to resume with
+            checkpoint=False,
+        )
+        return pipeline.run(
             inputs={
                 "level": level,
                 "position": position,
                 "location": location,
             }
         )
+
+    try:
+        result = await run_cancellable(request, run)
         return parse_crew_result(result)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/status/{task_id}", deprecated=True)
-def get_task_status(task_id: str):
+def get_task_status(request: Request, task_id: str):
     """
     [DEPRECATED] /crew/kickoff의 작업 상태를 조회합니다.
+
+    ETag / If-None-Match 및 exclude, omit_none 쿼리 파라미터를 지원합니다.
     """
     if task_id not in tasks:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -100,10 +131,11 @@ def get_task_status(task_id: str):
 
     if task["status"] == "completed":
         response["result"] = task["result"]
-    elif task["status"] == "failed":
+    elif task["status"] in ("failed", "cancelled"):
         response["error"] = task["error"]
+        response["resumable"] = CrewPipeline.exists(task_id)
 
-    return response
+    return compact_response(request, response)
 
 
 @router.get("/tasks", deprecated=True)
@@ -117,6 +149,57 @@ def list_tasks():
     }
 
 
+@router.delete("/tasks/{task_id}", deprecated=True)
+def cancel_task(task_id: str):
+    """
+    [DEPRECATED] 실행 중인 /crew/kickoff 작업을 취소합니다.
+
+    실행 중인 LLM 호출이나 도구 호출은 끝까지 진행되며, 다음 단계/태스크/도구 경계에서 중단됩니다.
+    """
+    if task_id not in tasks:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    task = tasks[task_id]
+    if task["status"] not in ("running", "cancelling"):
+        raise HTTPException(status_code=409, detail=f"Task is already {task['status']}")
+
+    task["cancel_token"].cancel("cancelled by client")
+    task["status"] = "cancelling"
+
+    return {"task_id": task_id, "status": task["status"]}
+
+
+@router.post("/tasks/{task_id}/resume", deprecated=True)
+def resume_task(
+    background_tasks: BackgroundTasks,
+    task_id: str,
+    timeout: Optional[float] = Form(None, gt=0),
+):
+    """
+    [DEPRECATED] 실패하거나 취소된 /crew/kickoff 작업을 이어서 실행합니다.
+
+    완료된 태스크는 체크포인트(output/checkpoints/<task_id>/)에서 복원되며, 나머지 태스크만 다시 실행됩니다.
+    서버가 재시작되어 작업 목록에 없더라도 체크포인트가 있으면 재개할 수 있습니다.
+    """
+    task = tasks.get(task_id)
+    if task is not None and task["status"] in ("running", "cancelling", "completed"):
+        raise HTTPException(status_code=409, detail=f"Task is already {task['status']}")
+    if not CrewPipeline.exists(task_id):
+        raise HTTPException(status_code=404, detail="No checkpoint found for task")
+
+    cancel_token = CancelToken(timeout=timeout)
+    tasks[task_id] = {
+        "status": "running",
+        "result": None,
+        "error": None,
+        "cancel_token": cancel_token,
+    }
+
+    background_tasks.add_task(resume_crew_task, task_id, cancel_token)
+
+    return {"task_id": task_id, "status": "running"}
+
+
 def _parse_job_sites(job_sites: Optional[str]) -> Optional[list[str]]:
     """
     Parse job_sites JSON string to list.
@@ -159,6 +242,7 @@ async def _get_resume_content(
 
 def run_crew_task(
     task_id: str,
+    cancel_token: CancelToken,
     level: str,
     position: str,
     location: str,
@@ -166,22 +250,41 @@ def run_crew_task(
     job_sites: Optional[list[str]],
 ):
     """
-    Background task to run the crew.
+    Background task to run the crew, checkpointed under the task id.
     """
-    try:
-        crew_instance = JobSearchCrew(
+    def run():
+        pipeline = CrewPipeline(
+            run_id=task_id,
             resume_text=resume_content,
             job_sites=job_sites,
-        ).crew()
-        result = crew_instance.kickoff(
+            cancel_token=cancel_token,
+        )
+        return pipeline.run(
             inputs={
                 "level": level,
                 "position": position,
                 "location": location,
             }
         )
+
+    _run_pipeline_task(task_id, run)
+
+
+def resume_crew_task(task_id: str, cancel_token: CancelToken):
+    """
+    Background task to resume a crew run from its checkpoints.
+    """
+    _run_pipeline_task(task_id, lambda: CrewPipeline.load(task_id, cancel_token=cancel_token).run())
+
+
+def _run_pipeline_task(task_id: str, run):
+    try:
+        result = run()
         tasks[task_id]["result"] = parse_crew_result(result).model_dump()
         tasks[task_id]["status"] = "completed"
+    except RunCancelled as e:
+        tasks[task_id]["error"] = e.reason
+        tasks[task_id]["status"] = "cancelled"
     except Exception as e:
         tasks[task_id]["error"] = str(e)
         tasks[task_id]["status"] = "failed"
@@ -192,8 +295,11 @@ def parse_crew_result(result) -> CrewResult:
     Parse CrewAI result into structured response.
     """
     crew_result = CrewResult()
+    markdown_outputs = {}
 
     for task_output in result.tasks_output:
+        if task_output.name in MARKDOWN_TASKS:
+            markdown_outputs[MARKDOWN_TASKS[task_output.name]] = task_output.raw
         if task_output.pydantic:
             if isinstance(task_output.pydantic, JobList):
                 crew_result.jobs = task_output.pydantic.jobs
@@ -202,19 +308,13 @@ def parse_crew_result(result) -> CrewResult:
             elif isinstance(task_output.pydantic, ChosenJob):
                 crew_result.chosen_job = task_output.pydantic
 
-    # Read output files if they exist
+    # Prefer this run's task outputs; fall back to the output files
     output_dir = Path("output")
 
-    resume_file = output_dir / "rewritten_resume.md"
-    if resume_file.exists():
-        crew_result.rewritten_resume = resume_file.read_text()
-
-    research_file = output_dir / "company_research.md"
-    if research_file.exists():
-        crew_result.company_research = research_file.read_text()
-
-    prep_file = output_dir / "interview_prep.md"
-    if prep_file.exists():
-        crew_result.interview_prep = prep_file.read_text()
+    for field in MARKDOWN_TASKS.values():
+        if markdown_outputs.get(field):
+            setattr(crew_result, field, markdown_outputs[field])
+        elif (output_dir / f"{field}.md").exists():
+            setattr(crew_result, field, (output_dir / f"{field}.md").read_text())
 
     return crew_result
@@ -0,0 +1,111 @@
+"""
+PDF export endpoints for the summary tab.
+"""
+from fastapi import APIRouter, HTTPException, Request, Form
+from fastapi.responses import FileResponse, JSONResponse
+from typing import Optional
+import json
+import re
+
+from app.crew.schemas import RankedJobList
+from app.utils import export
+from app.utils.results import read_json_body, resolve_input
+
+router = APIRouter(prefix="/crew/export", tags=["export"])
+
+DEFAULT_TITLE = "Job Search Summary"
+
+
+@router.post("")
+async def start_export(
+    request: Request,
+    title: Optional[str] = Form(None),
+    ranked_jobs: Optional[str] = Form(None),
+    ranked_jobs_ref: Optional[str] = Form(None),
+    rewritten_resume: Optional[str] = Form(None),
+    rewritten_resume_ref: Optional[str] = Form(None),
+    company_research: Optional[str] = Form(None),
+    company_research_ref: Optional[str] = Form(None),
+    interview_prep: Optional[str] = Form(None),
+    interview_prep_ref: Optional[str] = Form(None),
+):
+    """
+    선택한 결과물을 하나의 PDF로 변환하는 작업을 시작합니다.
+
+    각 문서는 값 또는 `<필드명>_ref` (단계별 API의 result_id)로 전달하며, 전달된 문서만 포함됩니다.
+    같은 내용의 PDF가 이미 생성되어 있으면 즉시 completed를 반환합니다.
+    """
+    body = await read_json_body(request)
+    title = title or body.get("title") or DEFAULT_TITLE
+
+    documents = []
+
+    ranked_jobs = resolve_input("ranked_jobs", ranked_jobs, body, ref=ranked_jobs_ref, required=False)
+    if ranked_jobs is not None:
+        documents.append(export.ranked_jobs_to_markdown(_parse_ranked_jobs(ranked_jobs)))
+
+    for name, value, ref in (
+        ("rewritten_resume", rewritten_resume, rewritten_resume_ref),
+        ("company_research", company_research, company_research_ref),
+        ("interview_prep", interview_prep, interview_prep_ref),
+    ):
+        document = resolve_input(name, value, body, ref=ref, required=False)
+        if document:
+            documents.append(document)
+
+    if not documents:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one of ranked_jobs, rewritten_resume, company_research or interview_prep must be provided",
+        )
+
+    export_id = export.start_export(title, documents)
+    response = _status_response(export_id)
+    status_code = 200 if response["status"] == "completed" else 202
+    return JSONResponse(response, status_code=status_code)
+
+
+@router.get("/{export_id}")
+def get_export_status(export_id: str):
+    """
+    PDF 변환 작업의 상태를 조회합니다.
+    """
+    return _status_response(export_id)
+
+
+@router.get("/{export_id}/download")
+def download_export(export_id: str):
+    """
+    생성된 PDF를 다운로드합니다.
+    """
+    status = _status_response(export_id)
+    if status["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Export is {status['status']}")
+
+    return FileResponse(
+        export.export_path(export_id),
+        media_type="application/pdf",
+        filename=f"job-search-{export_id[:8]}.pdf",
+        headers={"Cache-Control": "private, max-age=31536000, immutable"},
+    )
+
+
+def _status_response(export_id: str) -> dict:
+    status = export.export_status(export_id) if re.fullmatch(r"[0-9a-f]{32}", export_id) else None
+    if status is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+
+    response = {"export_id": export_id, **status}
+    if status["status"] == "completed":
+        response["download_url"] = f"{router.prefix}/{export_id}/download"
+    return response
+
+
+def _parse_ranked_jobs(ranked_jobs: str | dict | list) -> RankedJobList:
+    try:
+        data = json.loads(ranked_jobs) if isinstance(ranked_jobs, str) else ranked_jobs
+        if isinstance(data, list):
+            data = {"ranked_jobs": data}
+        return RankedJobList(**data)
+    except (json.JSONDecodeError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid ranked_jobs JSON: {e}")
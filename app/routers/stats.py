@@ -0,0 +1,25 @@
+"""
+Runtime statistics endpoints.
+"""
+from fastapi import APIRouter
+
+from app.crew.llm_router import llm_router
+from app.crew.repair import repair_stats
+
+router = APIRouter(prefix="/crew/stats", tags=["stats"])
+
+
+@router.get("/llm")
+def get_llm_stats():
+    """
+    LLM 티어별 호출 수, 실패율, 지연 시간, 토큰 사용량 및 비용을 조회합니다.
+    """
+    return llm_router.stats()
+
+
+@router.get("/repair")
+def get_repair_stats():
+    """
+    구조화 출력 로컬 복구 통계(복구 성공/LLM 재변환 횟수, 적용된 수정 유형별 횟수)를 조회합니다.
+    """
+    return repair_stats.snapshot()
@@ -1,8 +1,8 @@
 """
 Step-by-step API endpoints for incremental crew execution.
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File, Form
+from typing import Any, Optional
 import json
 
 from app.crew.steps import (
@@ -11,136 +11,305 @@ from app.crew.steps import (
     ResumeOptimizeStep,
     CompanyResearchStep,
     InterviewPrepStep,
+    SectionRegenerateStep,
 )
-from app.crew.schemas import JobList, RankedJobList, ChosenJob
+from app.crew import sections
+from app.crew.schemas import JobList, RankedJobList, ChosenJob, DocumentSection
 from app.utils.pdf import extract_text_from_pdf
+from app.utils.cancellation import run_cancellable
+from app.utils.http import compact_response
+from app.utils.results import results, store_result, read_json_body, resolve_input
 
 router = APIRouter(prefix="/crew/step", tags=["crew-steps"])
 
 
 @router.post("/search")
 async def step_search(
-    level: str = Form(...),
-    position: str = Form(...),
-    location: str = Form(...),
+    request: Request,
+    level: Optional[str] = Form(None),
+    position: Optional[str] = Form(None),
+    location: Optional[str] = Form(None),
     job_sites: Optional[str] = Form(None),
+    incremental: bool = Form(False),
 ):
     """
     Step 1: Search for job postings.
 
     Returns a list of jobs matching the criteria.
+    With incremental=true, postings already extracted for the same search are
+    served from the saved search and a delta (new/updated/removed) is returned.
     """
-    sites_list = _parse_job_sites(job_sites)
+    body = await read_json_body(request)
+    level = resolve_input("level", level, body)
+    position = resolve_input("position", position, body)
+    location = resolve_input("location", location, body)
+    sites_list = body["job_sites"] if isinstance(body.get("job_sites"), list) else _parse_job_sites(job_sites)
+    incremental = incremental or bool(body.get("incremental"))
+
+    def run(cancel_token):
+        step = JobSearchStep(job_sites=sites_list, cancel_token=cancel_token)
+        if incremental:
+            return step.run_incremental(level=level, position=position, location=location)
+        return step.run(level=level, position=position, location=location), None
 
     try:
-        step = JobSearchStep(job_sites=sites_list)
-        jobs = step.run(level=level, position=position, location=location)
-        return {"jobs": jobs.model_dump()}
+        jobs, delta = await run_cancellable(request, run)
+        payload = {"jobs": jobs.model_dump(mode="json")}
+        if delta is not None:
+            payload["delta"] = delta.model_dump()
+        return _step_response(request, payload)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/match")
 async def step_match(
-    jobs: str = Form(...),
+    request: Request,
+    jobs: Optional[str] = Form(None),
+    jobs_ref: Optional[str] = Form(None),
     resume_text: Optional[str] = Form(None),
     resume_file: Optional[UploadFile] = File(None),
 ):
     """
     Step 2: Match jobs against resume and select the best one.
 
-    Input: jobs (JSON from step 1)
+    Input: jobs (JSON from step 1) or jobs_ref (result_id of step 1)
     Returns: ranked_jobs and chosen_job
     """
-    resume_content = await _get_resume_content(resume_text, resume_file)
-    jobs_data = _parse_jobs(jobs)
+    body = await read_json_body(request)
+    resume_content = await _get_resume_content(resume_text or body.get("resume_text"), resume_file)
+    jobs_data = _parse_jobs(resolve_input("jobs", jobs, body, ref=jobs_ref))
 
     try:
-        step = JobMatchStep(resume_text=resume_content)
-        ranked_jobs, chosen_job = step.run(jobs=jobs_data)
-        return {
-            "ranked_jobs": ranked_jobs.model_dump(),
-            "chosen_job": chosen_job.model_dump(),
-        }
+        ranked_jobs, chosen_job = await run_cancellable(
+            request,
+            lambda cancel_token: JobMatchStep(
+                resume_text=resume_content, cancel_token=cancel_token
+            ).run(jobs=jobs_data),
+        )
+        return _step_response(request, {
+            "ranked_jobs": ranked_jobs.model_dump(mode="json"),
+            "chosen_job": chosen_job.model_dump(mode="json"),
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/resume")
 async def step_resume(
-    chosen_job: str = Form(...),
+    request: Request,
+    chosen_job: Optional[str] = Form(None),
+    chosen_job_ref: Optional[str] = Form(None),
     resume_text: Optional[str] = Form(None),
     resume_file: Optional[UploadFile] = File(None),
 ):
     """
     Step 3: Optimize resume for the chosen job.
 
-    Input: chosen_job (JSON from step 2)
+    Input: chosen_job (JSON from step 2) or chosen_job_ref (result_id of step 2)
     Returns: rewritten_resume (markdown)
     """
-    resume_content = await _get_resume_content(resume_text, resume_file)
-    chosen_job_data = _parse_chosen_job(chosen_job)
+    body = await read_json_body(request)
+    resume_content = await _get_resume_content(resume_text or body.get("resume_text"), resume_file)
+    chosen_job_data = _parse_chosen_job(resolve_input("chosen_job", chosen_job, body, ref=chosen_job_ref))
 
     try:
-        step = ResumeOptimizeStep(resume_text=resume_content)
-        rewritten_resume = step.run(chosen_job=chosen_job_data)
-        return {"rewritten_resume": rewritten_resume}
+        rewritten_resume = await run_cancellable(
+            request,
+            lambda cancel_token: ResumeOptimizeStep(
+                resume_text=resume_content, cancel_token=cancel_token
+            ).run(chosen_job=chosen_job_data),
+        )
+        resume_sections = sections.index_document(
+            sections.RESUME,
+            rewritten_resume,
+            _document_inputs(chosen_job_data, resume_content),
+        )
+        return _step_response(request, {
+            "rewritten_resume": rewritten_resume,
+            "sections": _section_meta(resume_sections),
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/research")
 async def step_research(
-    chosen_job: str = Form(...),
+    request: Request,
+    chosen_job: Optional[str] = Form(None),
+    chosen_job_ref: Optional[str] = Form(None),
     resume_text: Optional[str] = Form(None),
     resume_file: Optional[UploadFile] = File(None),
 ):
     """
     Step 4: Research the company.
 
-    Input: chosen_job (JSON from step 2)
+    Input: chosen_job (JSON from step 2) or chosen_job_ref (result_id of step 2)
     Returns: company_research (markdown)
     """
-    resume_content = await _get_resume_content(resume_text, resume_file)
-    chosen_job_data = _parse_chosen_job(chosen_job)
+    body = await read_json_body(request)
+    resume_content = await _get_resume_content(resume_text or body.get("resume_text"), resume_file)
+    chosen_job_data = _parse_chosen_job(resolve_input("chosen_job", chosen_job, body, ref=chosen_job_ref))
 
     try:
-        step = CompanyResearchStep(resume_text=resume_content)
-        company_research = step.run(chosen_job=chosen_job_data)
-        return {"company_research": company_research}
+        company_research = await run_cancellable(
+            request,
+            lambda cancel_token: CompanyResearchStep(
+                resume_text=resume_content, cancel_token=cancel_token
+            ).run(chosen_job=chosen_job_data),
+        )
+        return _step_response(request, {"company_research": company_research})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/interview")
 async def step_interview(
-    chosen_job: str = Form(...),
-    rewritten_resume: str = Form(...),
-    company_research: str = Form(...),
+    request: Request,
+    chosen_job: Optional[str] = Form(None),
+    chosen_job_ref: Optional[str] = Form(None),
+    rewritten_resume: Optional[str] = Form(None),
+    rewritten_resume_ref: Optional[str] = Form(None),
+    company_research: Optional[str] = Form(None),
+    company_research_ref: Optional[str] = Form(None),
     resume_text: Optional[str] = Form(None),
     resume_file: Optional[UploadFile] = File(None),
 ):
     """
     Step 5: Prepare for interview.
 
-    Input: chosen_job, rewritten_resume, company_research (from previous steps)
+    Input: chosen_job, rewritten_resume, company_research (from previous steps),
+    each either inline or as a `<name>_ref` result_id
     Returns: interview_prep (markdown)
     """
-    resume_content = await _get_resume_content(resume_text, resume_file)
-    chosen_job_data = _parse_chosen_job(chosen_job)
+    body = await read_json_body(request)
+    resume_content = await _get_resume_content(resume_text or body.get("resume_text"), resume_file)
+    chosen_job_data = _parse_chosen_job(resolve_input("chosen_job", chosen_job, body, ref=chosen_job_ref))
+    rewritten_resume = resolve_input("rewritten_resume", rewritten_resume, body, ref=rewritten_resume_ref)
+    company_research = resolve_input("company_research", company_research, body, ref=company_research_ref)
 
     try:
-        step = InterviewPrepStep(resume_text=resume_content)
-        interview_prep = step.run(
-            chosen_job=chosen_job_data,
-            rewritten_resume=rewritten_resume,
-            company_research=company_research,
+        interview_prep = await run_cancellable(
+            request,
+            lambda cancel_token: InterviewPrepStep(
+                resume_text=resume_content, cancel_token=cancel_token
+            ).run(
+                chosen_job=chosen_job_data,
+                rewritten_resume=rewritten_resume,
+                company_research=company_research,
+            ),
+        )
+        interview_sections = sections.index_document(
+            sections.INTERVIEW,
+            interview_prep,
+            _document_inputs(chosen_job_data, resume_content, rewritten_resume, company_research),
         )
-        return {"interview_prep": interview_prep}
+        return _step_response(request, {
+            "interview_prep": interview_prep,
+            "sections": _section_meta(interview_sections),
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/resume/regenerate")
+async def step_resume_regenerate(
+    request: Request,
+    rewritten_resume: Optional[str] = Form(None),
+    rewritten_resume_ref: Optional[str] = Form(None),
+    chosen_job: Optional[str] = Form(None),
+    chosen_job_ref: Optional[str] = Form(None),
+    sections_meta: Optional[str] = Form(None, alias="sections"),
+    regenerate: Optional[str] = Form(None),
+    resume_text: Optional[str] = Form(None),
+    resume_file: Optional[UploadFile] = File(None),
+):
+    """
+    Step 3 (partial): Regenerate only the changed or requested sections of the rewritten resume.
+
+    Input: rewritten_resume (current, possibly edited), chosen_job,
+    sections (metadata from the previous response), regenerate (section ids)
+    Returns: rewritten_resume, sections, and the regenerated/reused/kept section ids
+    """
+    body = await read_json_body(request)
+    resume_content = await _get_resume_content(resume_text or body.get("resume_text"), resume_file)
+    document = resolve_input("rewritten_resume", rewritten_resume, body, ref=rewritten_resume_ref)
+    chosen_job_data = _parse_chosen_job(resolve_input("chosen_job", chosen_job, body, ref=chosen_job_ref))
+
+    return await _regenerate_document(
+        request,
+        kind=sections.RESUME,
+        output_field="rewritten_resume",
+        document=document,
+        inputs=_document_inputs(chosen_job_data),
+        resume_content=resume_content,
+        previous=_parse_sections_meta(sections_meta if sections_meta is not None else body.get("sections")),
+        regenerate=_parse_section_ids(regenerate if regenerate is not None else body.get("regenerate")),
+    )
+
+
+@router.post("/interview/regenerate")
+async def step_interview_regenerate(
+    request: Request,
+    interview_prep: Optional[str] = Form(None),
+    interview_prep_ref: Optional[str] = Form(None),
+    chosen_job: Optional[str] = Form(None),
+    chosen_job_ref: Optional[str] = Form(None),
+    rewritten_resume: Optional[str] = Form(None),
+    rewritten_resume_ref: Optional[str] = Form(None),
+    company_research: Optional[str] = Form(None),
+    company_research_ref: Optional[str] = Form(None),
+    sections_meta: Optional[str] = Form(None, alias="sections"),
+    regenerate: Optional[str] = Form(None),
+    resume_text: Optional[str] = Form(None),
+    resume_file: Optional[UploadFile] = File(None),
+):
+    """
+    Step 5 (partial): Regenerate only the changed or requested sections of the interview prep.
+
+    Input: interview_prep (current, possibly edited), chosen_job, rewritten_resume,
+    company_research, sections (metadata from the previous response), regenerate (section ids)
+    Returns: interview_prep, sections, and the regenerated/reused/kept section ids
+    """
+    body = await read_json_body(request)
+    resume_content = await _get_resume_content(resume_text or body.get("resume_text"), resume_file)
+    document = resolve_input("interview_prep", interview_prep, body, ref=interview_prep_ref)
+    chosen_job_data = _parse_chosen_job(resolve_input("chosen_job", chosen_job, body, ref=chosen_job_ref))
+    rewritten_resume = resolve_input("rewritten_resume", rewritten_resume, body, ref=rewritten_resume_ref)
+    company_research = resolve_input("company_research", company_research, body, ref=company_research_ref)
+
+    return await _regenerate_document(
+        request,
+        kind=sections.INTERVIEW,
+        output_field="interview_prep",
+        document=document,
+        inputs=_document_inputs(chosen_job_data, rewritten_resume=rewritten_resume, company_research=company_research),
+        resume_content=resume_content,
+        previous=_parse_sections_meta(sections_meta if sections_meta is not None else body.get("sections")),
+        regenerate=_parse_section_ids(regenerate if regenerate is not None else body.get("regenerate")),
+    )
+
+
+@router.get("/results/{result_id}")
+def get_step_result(request: Request, result_id: str):
+    """
+    Read a stored step result. Supports ETag / If-None-Match.
+    """
+    if result_id not in results:
+        raise HTTPException(status_code=404, detail="Result not found")
+    return compact_response(request, {**results[result_id], "result_id": result_id})
+
+
 # Helper functions
 
 def _parse_job_sites(job_sites: Optional[str]) -> Optional[list[str]]:
@@ -153,22 +322,119 @@ def _parse_job_sites(job_sites: Optional[str]) -> Optional[list[str]]:
         return None
 
 
-def _parse_jobs(jobs_json: str) -> JobList:
+def _parse_jobs(jobs_json: str | dict | list) -> JobList:
     try:
-        data = json.loads(jobs_json)
+        data = json.loads(jobs_json) if isinstance(jobs_json, str) else jobs_json
+        if isinstance(data, list):
+            data = {"jobs": data}
         return JobList(**data)
-    except (json.JSONDecodeError, ValueError) as e:
+    except (json.JSONDecodeError, TypeError, ValueError) as e:
         raise HTTPException(status_code=400, detail=f"Invalid jobs JSON: {e}")
 
 
-def _parse_chosen_job(chosen_job_json: str) -> ChosenJob:
+def _parse_chosen_job(chosen_job_json: str | dict) -> ChosenJob:
     try:
-        data = json.loads(chosen_job_json)
+        data = json.loads(chosen_job_json) if isinstance(chosen_job_json, str) else chosen_job_json
         return ChosenJob(**data)
-    except (json.JSONDecodeError, ValueError) as e:
+    except (json.JSONDecodeError, TypeError, ValueError) as e:
         raise HTTPException(status_code=400, detail=f"Invalid chosen_job JSON: {e}")
 
 
+def _document_inputs(
+    chosen_job: ChosenJob,
+    resume_text: Optional[str] = None,
+    rewritten_resume: Optional[str] = None,
+    company_research: Optional[str] = None,
+) -> dict[str, str]:
+    """
+    Inputs that generated documents depend on, keyed as in app.crew.sections.
+    """
+    inputs = {
+        "chosen_job": chosen_job.model_dump_json(),
+        "resume_text": resume_text,
+        "rewritten_resume": rewritten_resume,
+        "company_research": company_research,
+    }
+    return {name: value for name, value in inputs.items() if value is not None}
+
+
+def _section_meta(document_sections: list[DocumentSection]) -> list[dict]:
+    """
+    Section metadata for responses; content is already in the document itself.
+    """
+    return [section.model_dump(exclude={"content"}) for section in document_sections]
+
+
+def _parse_sections_meta(value: Any) -> dict[str, str]:
+    """
+    Map section id -> input_hash from the `sections` of a previous response.
+    """
+    if not value:
+        return {}
+    try:
+        items = json.loads(value) if isinstance(value, str) else value
+        return {item["id"]: item["input_hash"] for item in items}
+    except (json.JSONDecodeError, TypeError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sections JSON: {e}")
+
+
+def _parse_section_ids(value: Any) -> list[str]:
+    if not value:
+        return []
+    try:
+        ids = json.loads(value) if isinstance(value, str) else value
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid regenerate JSON: {e}")
+    if not isinstance(ids, list):
+        raise HTTPException(status_code=400, detail="regenerate must be a JSON array of section ids")
+    return [str(sid) for sid in ids]
+
+
+async def _regenerate_document(
+    request: Request,
+    kind: str,
+    output_field: str,
+    document: str,
+    inputs: dict[str, str],
+    resume_content: str,
+    previous: dict[str, str],
+    regenerate: list[str],
+):
+    try:
+        markdown, document_sections, report = await run_cancellable(
+            request,
+            lambda cancel_token: SectionRegenerateStep(
+                resume_text=resume_content, cancel_token=cancel_token
+            ).run(
+                kind=kind,
+                document=document,
+                inputs=inputs,
+                previous=previous,
+                regenerate=regenerate,
+            ),
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return _step_response(request, {
+        output_field: markdown,
+        "sections": _section_meta(document_sections),
+        **report,
+    })
+
+
+def _step_response(request: Request, payload: dict):
+    """
+    Store a step result for later reference and return it as a compact response.
+    """
+    result_id = store_result(payload)
+    return compact_response(request, {**payload, "result_id": result_id})
+
+
 async def _get_resume_content(
     resume_text: Optional[str],
     resume_file: Optional[UploadFile],
@@ -0,0 +1,76 @@
+import asyncio
+import os
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.crew.cancellation import CancelToken, RunCancelled
+
+T = TypeVar("T")
+
+STEP_TIMEOUT_SECONDS = float(os.getenv("STEP_TIMEOUT_SECONDS", "600"))
+DISCONNECT_POLL_SECONDS = 1.0
+
+# nginx convention for "client closed request"
+CLIENT_CLOSED_REQUEST = 499
+
+
+def request_timeout(request: Request) -> Optional[float]:
+    """
+    Read the per-request deadline from the X-Request-Timeout header (seconds).
+
+    STEP_TIMEOUT_SECONDS caps the header; 0 disables the default deadline,
+    so without a header the request has none (None).
+    """
+    default = STEP_TIMEOUT_SECONDS if STEP_TIMEOUT_SECONDS > 0 else None
+    header = request.headers.get("x-request-timeout")
+    if header:
+        try:
+            timeout = float(header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="X-Request-Timeout must be a number of seconds")
+        if timeout > 0:
+            return min(timeout, default) if default else timeout
+    return default
+
+
+async def run_cancellable(request: Request, func: Callable[[CancelToken], T]) -> T:
+    """
+    Run a blocking crew call in the threadpool, bound to the request lifetime.
+
+    The run is cancelled when the client disconnects or the deadline passes;
+    the worker stops at its next step, task or tool boundary.
+    """
+    token = CancelToken(timeout=request_timeout(request))
+    work = asyncio.ensure_future(run_in_threadpool(func, token))
+
+    while not work.done():
+        remaining = token.remaining
+        wait_for = DISCONNECT_POLL_SECONDS if remaining is None else min(DISCONNECT_POLL_SECONDS, remaining)
+        await asyncio.wait({work}, timeout=wait_for)
+        if work.done():
+            break
+        if await request.is_disconnected():
+            token.cancel("client disconnected")
+        if token.cancelled:
+            # The worker keeps running until its next boundary; consume its
+            # eventual RunCancelled so asyncio does not log it as unretrieved
+            work.add_done_callback(_consume_result)
+            _raise_cancelled(token.reason)
+
+    try:
+        return work.result()
+    except RunCancelled as e:
+        _raise_cancelled(e.reason)
+
+
+def _consume_result(future: asyncio.Future):
+    if not future.cancelled():
+        future.exception()
+
+
+def _raise_cancelled(reason: Optional[str]):
+    if reason == CancelToken.DEADLINE_EXCEEDED:
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
+    raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=reason or "Request cancelled")
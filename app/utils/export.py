@@ -0,0 +1,176 @@
+"""
+Background PDF export of generated artifacts.
+
+Exports are rendered in a process pool so they never block the API, and
+cached on disk by a content hash of their inputs, so repeat downloads of
+the same documents are served straight from the file. Files not requested
+for EXPORT_TTL_SECONDS are swept.
+"""
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+from app.crew.schemas import RankedJobList
+from app.utils.pdf import PAGE_BREAK, render_markdown_to_pdf
+
+EXPORT_DIR = Path("output") / "exports"
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+
+# Bump when the renderer output changes to invalidate cached files
+RENDER_VERSION = "1"
+
+# Exported files not requested for this long are deleted
+EXPORT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+_executor: Optional[ProcessPoolExecutor] = None
+_jobs: dict[str, Future] = {}
+_lock = Lock()
+
+
+def ranked_jobs_to_markdown(ranked_jobs: RankedJobList) -> str:
+    """
+    Render match results (Output 1) as markdown, best match first.
+    """
+    lines = ["# 최적 매칭 결과", ""]
+    ranked = sorted(ranked_jobs.ranked_jobs, key=lambda item: item.match_score, reverse=True)
+
+    for rank, item in enumerate(ranked, start=1):
+        job = item.job
+        lines += [
+            f"## {rank}. {job.job_title} – {job.company_name} ({item.match_score}/5)",
+            "",
+            f"- 근무지: {job.job_location}",
+        ]
+        if job.employment_type:
+            lines.append(f"- 고용 형태: {job.employment_type}")
+        if job.compensation:
+            lines.append(f"- 급여: {job.compensation}")
+        lines += [
+            f"- 공고: {job.job_posting_url}",
+            "",
+            f"**매칭 이유:** {item.reason}",
+            "",
+            job.job_summary,
+            "",
+        ]
+
+    return "\n".join(lines)
+
+
+def export_id_for(title: str, documents: list[str]) -> str:
+    digest = hashlib.sha256()
+    for part in [RENDER_VERSION, title, *documents]:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:32]
+
+
+def export_path(export_id: str) -> Path:
+    return EXPORT_DIR / f"{export_id}.pdf"
+
+
+def sweep_exports():
+    """
+    Delete exported files, and temp files of crashed renders, older than the TTL.
+    """
+    if not EXPORT_DIR.exists():
+        return
+    cutoff = time.time() - EXPORT_TTL_SECONDS
+    for path in EXPORT_DIR.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def start_export(title: str, documents: list[str]) -> str:
+    """
+    Queue a PDF export of the given markdown documents, one after another.
+
+    Returns the export id; if an identical export was already rendered or is
+    in progress, no new work is queued.
+    """
+    export_id = export_id_for(title, documents)
+    path = export_path(export_id)
+    sweep_exports()
+
+    with _lock:
+        # Finished renders are tracked by their file; only keep pending and failed jobs
+        for key in [key for key, job in _jobs.items() if job.done() and job.exception() is None]:
+            del _jobs[key]
+
+        if path.exists():
+            # Mark as recently used so the sweep keeps it
+            os.utime(path)
+            return export_id
+        job = _jobs.get(export_id)
+        if job is not None and not job.done():
+            return export_id
+
+        markdown = f"\n{PAGE_BREAK}\n".join(documents)
+        try:
+            job = _get_executor().submit(_render_to_file, markdown, title, str(path))
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); replace the pool and retry once
+            _reset_executor()
+            job = _get_executor().submit(_render_to_file, markdown, title, str(path))
+        _jobs[export_id] = job
+
+    return export_id
+
+
+def export_status(export_id: str) -> Optional[dict]:
+    """
+    Status of an export, or None if it is unknown.
+    """
+    if export_path(export_id).exists():
+        return {"status": "completed"}
+
+    job = _jobs.get(export_id)
+    if job is None:
+        return None
+    if not job.done():
+        return {"status": "running"}
+    error = job.exception()
+    if error is not None:
+        return {"status": "failed", "error": str(error)}
+    return {"status": "completed"}
+
+
+def shutdown():
+    _reset_executor()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=EXPORT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _reset_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _render_to_file(markdown: str, title: str, path: str):
+    """
+    Worker entry point: render and atomically write the PDF.
+    """
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(render_markdown_to_pdf(markdown, title))
+    tmp_path.replace(target)
@@ -0,0 +1,125 @@
+"""
+Compact, compressed and cacheable JSON responses.
+
+Responses are serialized with orjson and compressed with brotli or gzip,
+depending on the client's Accept-Encoding.
+"""
+import gzip
+import hashlib
+from typing import Any, Iterable, Optional
+
+import brotli
+import orjson
+from fastapi import Request, Response
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON.
+    """
+    return orjson.dumps(payload)
+
+
+def project(payload: Any, exclude: Iterable[str] = (), omit_none: bool = False) -> Any:
+    """
+    Drop the given field names at any depth, and optionally null values.
+    """
+    exclude = set(exclude)
+    if not exclude and not omit_none:
+        return payload
+    return _project(payload, exclude, omit_none)
+
+
+def compact_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    """
+    Build a JSON response honouring projection, ETag and compression.
+
+    Query params:
+        exclude: comma-separated field names to drop (e.g. full_raw_job_description)
+        omit_none: drop null fields when true
+    """
+    exclude = [name.strip() for name in request.query_params.get("exclude", "").split(",") if name.strip()]
+    omit_none = request.query_params.get("omit_none", "").lower() in ("1", "true", "yes")
+
+    body = dumps(project(payload, exclude=exclude, omit_none=omit_none))
+    etag = hashlib.sha256(body).hexdigest()[:32]
+
+    is_read = request.method in ("GET", "HEAD")
+    if is_read and _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": f'"{etag}"'})
+
+    headers = {"ETag": f'"{etag}"', "Vary": "Accept-Encoding"}
+    encoding = _negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding and len(body) >= MIN_COMPRESS_BYTES:
+        body = _compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+        headers["ETag"] = f'"{etag}-{encoding}"'
+
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def _project(value: Any, exclude: set[str], omit_none: bool) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: _project(item, exclude, omit_none)
+            for key, item in value.items()
+            if key not in exclude and not (omit_none and item is None)
+        }
+    if isinstance(value, list):
+        return [_project(item, exclude, omit_none) for item in value]
+    return value
+
+
+def _negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick br or gzip from an Accept-Encoding header, preferring br.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+
+    if accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compare If-None-Match against the identity ETag, ignoring weak prefixes
+    and the content-encoding suffix of compressed variants.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/").strip('"')
+        if candidate.split("-", 1)[0] == etag:
+            return True
+    return False
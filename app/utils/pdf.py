@@ -1,3 +1,5 @@
+import re
+import zlib
 from io import BytesIO
 from pypdf import PdfReader
 
@@ -15,3 +17,216 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> str:
             text_parts.append(text)
 
     return "\n\n".join(text_parts)
+
+
+# --- Markdown to PDF rendering -------------------------------------------------
+#
+# A small PDF writer for exporting generated markdown. Text is set in the
+# standard Adobe Korean CID font (HYGoThic-Medium, UniKS-UCS2-H), which PDF
+# viewers provide without embedding, so Korean and Latin text render without
+# extra dependencies.
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 56
+LINE_SPACING = 1.45
+PAGE_BREAK = "\f"
+
+FONT_SIZES = {1: 18, 2: 15, 3: 12.5}
+BODY_FONT_SIZE = 10.5
+CODE_INDENT = 12
+BULLET_INDENT = 14
+
+
+def render_markdown_to_pdf(markdown: str, title: str = "") -> bytes:
+    """
+    Render markdown to PDF bytes.
+
+    Supports headings, bullet and numbered lists, code blocks and paragraphs;
+    inline emphasis, code and links are rendered as plain text. A form feed
+    line ("\\f") starts a new page.
+    """
+    pages = _layout(_parse_markdown(markdown))
+    return _write_pdf(pages, title)
+
+
+def _parse_markdown(markdown: str) -> list[tuple[str, float, float, str]]:
+    """
+    Convert markdown into (kind, font_size, indent, text) blocks.
+    """
+    blocks = []
+    in_code = False
+
+    # str.splitlines() would also split on the form feed used for page breaks
+    for raw_line in markdown.split("\n"):
+        if raw_line.strip(" \r") == PAGE_BREAK:
+            blocks.append(("page_break", 0, 0, ""))
+            continue
+
+        line = raw_line.rstrip()
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+            continue
+        if in_code:
+            blocks.append(("line", BODY_FONT_SIZE, CODE_INDENT, line))
+            continue
+        if not line.strip():
+            blocks.append(("blank", BODY_FONT_SIZE, 0, ""))
+            continue
+
+        heading = re.match(r"^(#{1,6})\s+(.*)$", line)
+        if heading:
+            level = len(heading.group(1))
+            blocks.append(("heading", FONT_SIZES.get(level, BODY_FONT_SIZE + 1), 0, _strip_inline(heading.group(2))))
+            continue
+
+        if re.match(r"^\s*([-*_])(\s*\1){2,}\s*$", line):
+            blocks.append(("blank", BODY_FONT_SIZE, 0, ""))
+            continue
+
+        indent = (len(line) - len(line.lstrip())) / 2 * BULLET_INDENT
+        bullet = re.match(r"^\s*[-*+]\s+(.*)$", line)
+        if bullet:
+            blocks.append(("line", BODY_FONT_SIZE, indent + BULLET_INDENT, "· " + _strip_inline(bullet.group(1))))
+            continue
+        numbered = re.match(r"^\s*(\d+[.)])\s+(.*)$", line)
+        if numbered:
+            blocks.append(("line", BODY_FONT_SIZE, indent + BULLET_INDENT, f"{numbered.group(1)} {_strip_inline(numbered.group(2))}"))
+            continue
+
+        blocks.append(("line", BODY_FONT_SIZE, indent, _strip_inline(line.lstrip("> "))))
+
+    return blocks
+
+
+def _strip_inline(text: str) -> str:
+    text = re.sub(r"!?\[([^\]]*)\]\(([^)]*)\)", r"\1", text)
+    text = re.sub(r"(\*\*|__|\*|_|`)(.+?)\1", r"\2", text)
+    return text
+
+
+def _char_width(char: str) -> float:
+    """
+    Approximate advance width in ems: half width for ASCII, full width otherwise.
+    """
+    return 0.5 if ord(char) < 0x1100 else 1.0
+
+
+def _wrap(text: str, font_size: float, max_width: float) -> list[str]:
+    lines, current, width = [], "", 0.0
+    for char in text:
+        char_width = _char_width(char) * font_size
+        if width + char_width > max_width and current:
+            # Prefer breaking at the last space on the line
+            split_at = current.rfind(" ")
+            if split_at > 0:
+                lines.append(current[:split_at])
+                current = current[split_at + 1:]
+            else:
+                lines.append(current)
+                current = ""
+            width = sum(_char_width(c) for c in current) * font_size
+        current += char
+        width += char_width
+    lines.append(current)
+    return lines
+
+
+def _layout(blocks: list[tuple[str, float, float, str]]) -> list[list[tuple[float, float, float, str]]]:
+    """
+    Place blocks on pages as (x, y, font_size, text) runs.
+    """
+    pages: list[list[tuple[float, float, float, str]]] = [[]]
+    y = PAGE_HEIGHT - MARGIN
+
+    def new_page():
+        nonlocal y
+        if pages[-1]:
+            pages.append([])
+        y = PAGE_HEIGHT - MARGIN
+
+    for kind, font_size, indent, text in blocks:
+        if kind == "page_break":
+            new_page()
+            continue
+        if kind == "blank":
+            if pages[-1] and y < PAGE_HEIGHT - MARGIN:
+                y -= BODY_FONT_SIZE * 0.6
+            continue
+        if kind == "heading" and pages[-1]:
+            y -= font_size * 0.5
+
+        for line in _wrap(text, font_size, PAGE_WIDTH - 2 * MARGIN - indent):
+            line_height = font_size * LINE_SPACING
+            if y - line_height < MARGIN:
+                new_page()
+            y -= line_height
+            pages[-1].append((MARGIN + indent, y, font_size, line))
+
+    return pages
+
+
+def _hex_ucs2(text: str) -> str:
+    return "".join(f"{ord(c):04X}" if ord(c) <= 0xFFFF else "003F" for c in text)
+
+
+def _write_pdf(pages: list[list[tuple[float, float, float, str]]], title: str) -> bytes:
+    objects: list[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    catalog_id = add(b"")
+    pages_id = add(b"")
+    descriptor_id = add(
+        b"<< /Type /FontDescriptor /FontName /HYGoThic-Medium /Flags 6 "
+        b"/FontBBox [-6 -145 1003 880] /ItalicAngle 0 /Ascent 880 /Descent -120 "
+        b"/CapHeight 880 /StemV 93 >>"
+    )
+    cid_font_id = add(
+        b"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /HYGoThic-Medium "
+        b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Korea1) /Supplement 1 >> "
+        b"/FontDescriptor %d 0 R /DW 1000 /W [1 95 500] >>" % descriptor_id
+    )
+    font_id = add(
+        b"<< /Type /Font /Subtype /Type0 /BaseFont /HYGoThic-Medium "
+        b"/Encoding /UniKS-UCS2-H /DescendantFonts [%d 0 R] >>" % cid_font_id
+    )
+
+    page_ids = []
+    for runs in pages:
+        commands = [
+            f"BT /F1 {size:g} Tf 1 0 0 1 {x:.2f} {y:.2f} Tm <{_hex_ucs2(text)}> Tj ET"
+            for x, y, size, text in runs
+        ]
+        stream = zlib.compress("\n".join(commands).encode("ascii"))
+        content_id = add(
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, PAGE_WIDTH, PAGE_HEIGHT, font_id, content_id)
+        ))
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode("ascii")
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+    objects[catalog_id - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    info_id = add(b"<< /Title <FEFF%s> /Producer (job-hunter-agent) >>" % title.encode("utf-16-be").hex().upper().encode("ascii"))
+
+    output = BytesIO()
+    output.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % number + obj + b"\nendobj\n")
+
+    xref_offset = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(
+        b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, catalog_id, info_id, xref_offset)
+    )
+    return output.getvalue()
@@ -0,0 +1,70 @@
+"""
+In-memory step results and request input resolution.
+
+Step responses are stored under a content-hash result_id so later requests
+can pass `<name>_ref` instead of re-posting large payloads.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request
+
+from app.utils.http import dumps
+
+MAX_STORED_RESULTS = 500
+
+results: OrderedDict[str, dict] = OrderedDict()
+
+
+def store_result(payload: dict) -> str:
+    result_id = hashlib.sha256(dumps(payload)).hexdigest()[:32]
+    results[result_id] = payload
+    results.move_to_end(result_id)
+    while len(results) > MAX_STORED_RESULTS:
+        results.popitem(last=False)
+    return result_id
+
+
+async def read_json_body(request: Request) -> dict:
+    """
+    Parse an application/json request body; form requests yield an empty dict.
+    """
+    if not request.headers.get("content-type", "").startswith("application/json"):
+        return {}
+    try:
+        body = await request.json()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="JSON body must be an object")
+    return body
+
+
+def resolve_input(
+    name: str,
+    value: Any,
+    body: dict,
+    ref: Optional[str] = None,
+    required: bool = True,
+) -> Any:
+    """
+    Resolve an input from the form field, the JSON body, or a `<name>_ref`
+    result_id pointing at a stored step result with that field.
+    """
+    if value is not None:
+        return value
+    if body.get(name) is not None:
+        return body[name]
+
+    ref = ref or body.get(f"{name}_ref")
+    if ref:
+        stored = results.get(ref)
+        if stored is None or name not in stored:
+            raise HTTPException(status_code=404, detail=f"{name}_ref does not reference a stored {name}")
+        results.move_to_end(ref)
+        return stored[name]
+
+    if required:
+        raise HTTPException(status_code=400, detail=f"{name} is required")
+    return None
@@ -0,0 +1,51 @@
+import json
+from collections import Counter
+from datetime import date
+
+from app.crew.repair import coerce_value, repair
+from app.crew.schemas import JobList, RankedJobList
+
+JOB = {
+    "job_title": "Backend Engineer",
+    "company_name": "Acme",
+    "job_location": "Seoul",
+    "job_posting_url": "https://example.com/jobs/1",
+    "job_summary": "Build APIs.",
+}
+
+
+def test_iso_date_is_kept_for_optional_field():
+    fixes = Counter()
+    assert coerce_value("2024-05-01", date | None, fixes, "date_listed") == date(2024, 5, 1)
+    assert not fixes
+
+
+def test_dotted_date_is_coerced():
+    fixes = Counter()
+    assert coerce_value("2024.05.01", date | None, fixes, "date_listed") == date(2024, 5, 1)
+    assert fixes["coerced_date"] == 1
+
+
+def test_unparseable_optional_date_is_nulled():
+    fixes = Counter()
+    assert coerce_value("unknown", date | None, fixes, "date_listed") is None
+    assert fixes["nulled_date_listed"] == 1
+
+
+def test_fraction_match_score_is_coerced():
+    assert coerce_value("4/5", int, Counter(), "match_score") == 4
+    assert coerce_value("8/10", int, Counter(), "match_score") == 4
+
+
+def test_repair_keeps_iso_date():
+    text = json.dumps({"jobs": [{**JOB, "date_listed": "2024-05-01"}]})
+    result = repair(text, JobList)
+    assert result.jobs[0].date_listed == date(2024, 5, 1)
+
+
+def test_repair_fenced_ranked_jobs():
+    ranked = json.dumps({"ranked_jobs": [{"job": JOB, "match_score": "4/5", "reason": "Fits"}]})
+    text = f"Here are the results:\n```json\n{ranked}\n```"
+    result = repair(text, RankedJobList)
+    assert result.ranked_jobs[0].match_score == 4
+    assert result.ranked_jobs[0].job.company_name == "Acme"